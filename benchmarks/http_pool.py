@@ -0,0 +1,95 @@
+"""Сравнивает стоимость опроса через requests.get и через пул сессии.
+
+Запуск: python benchmarks/http_pool.py [--polls N] [--delay SECONDS]
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client  # noqa: E402
+
+
+BODY = json.dumps({'homeworks': [], 'current_date': 0}).encode()
+REPORT = (
+    '{name:>14}: {per_poll:7.3f} ms/poll, '
+    '{connections} TCP connections for {polls} polls'
+)
+SAVED = 'saved per poll: {0:.3f} ms ({1:.0%})'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Отвечает как homework_statuses и считает новые соединения."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    connections = 0
+    accept_delay = 0
+
+    def setup(self):
+        """Имитирует стоимость установки соединения."""
+        type(self).connections += 1
+        time.sleep(self.accept_delay)
+        super().setup()
+
+    def do_GET(self):
+        """Отдаёт пустой список домашних работ."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        """Не пишет в stderr на каждый запрос."""
+
+
+def measure(name, get, url, polls):
+    """Возвращает среднее время одного опроса в миллисекундах."""
+    StandInHandler.connections = 0
+    started = time.perf_counter()
+    for timestamp in range(polls):
+        get(url, params={'from_date': timestamp}, timeout=5).json()
+    per_poll = (time.perf_counter() - started) * 1000 / polls
+    print(REPORT.format(
+        name=name,
+        per_poll=per_poll,
+        connections=StandInHandler.connections,
+        polls=polls
+    ))
+    return per_poll
+
+
+def main():
+    """Запускает локальный сервер и оба варианта опроса."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--polls', type=int, default=500)
+    parser.add_argument(
+        '--delay', type=float, default=0.002,
+        help='искусственная задержка на установку соединения, с'
+    )
+    args = parser.parse_args()
+    StandInHandler.accept_delay = args.delay
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = 'http://127.0.0.1:{0}/api/user_api/homework_statuses/'.format(
+        server.server_port
+    )
+    try:
+        cold = measure('requests.get', requests.get, url, args.polls)
+        with http_client.build_session() as session:
+            pooled = measure('pooled session', session.get, url, args.polls)
+    finally:
+        server.shutdown()
+    print(SAVED.format(cold - pooled, (cold - pooled) / cold))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Проверяет время холодного импорта homework против бюджета.
+
+Несколько раз импортирует homework в отдельном процессе под
+python -X importtime, берёт лучший прогон и печатает самые дорогие
+модули. Завершается с кодом 1, если импорт дольше бюджета или
+потянул за собой тяжёлые зависимости, которые должны грузиться лениво.
+Запуск: python benchmarks/import_time.py [--budget MS] [--runs N] [--top N]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = 'homework'
+DEFERRED = ('telegram', 'requests', 'urllib3', 'dotenv', 'yaml', 'asyncio')
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+REPORT = '{cumulative:8.1f} ms {self:8.1f} ms  {name}'
+TOTAL = 'import {module}: {total:.1f} ms, budget {budget:.1f} ms'
+OVER_BUDGET = 'Import is {0:.1f} ms over budget'
+EAGER_IMPORTS = 'Imported eagerly: {0}'
+
+
+def measure():
+    """Импортирует модуль в новом процессе и разбирает отчёт importtime.
+
+    Возвращает словарь имя -> (собственное время, суммарное) в
+    микросекундах для модулей, импортированных впервые.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {MODULE}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, _, name = match.groups()
+            modules[name] = (int(own), int(cumulative))
+    return modules
+
+
+def main():
+    """Печатает отчёт и возвращает код выхода."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget', type=float, default=150,
+                        help='допустимое время импорта, мс')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15,
+                        help='сколько самых дорогих модулей показать')
+    args = parser.parse_args()
+    measure()
+    best = min(
+        (measure() for _ in range(args.runs)),
+        key=lambda modules: modules[MODULE][1]
+    )
+    for name, (own, cumulative) in sorted(
+        best.items(), key=lambda item: item[1][1], reverse=True
+    )[:args.top]:
+        print(REPORT.format(
+            cumulative=cumulative / 1000, self=own / 1000, name=name
+        ))
+    total = best[MODULE][1] / 1000
+    print(TOTAL.format(module=MODULE, total=total, budget=args.budget))
+    failed = False
+    eager = sorted(
+        name for name in best if name.split('.')[0] in DEFERRED
+    )
+    if eager:
+        print(EAGER_IMPORTS.format(', '.join(eager)))
+        failed = True
+    if total > args.budget:
+        print(OVER_BUDGET.format(total - args.budget))
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Нагрузочный прогон бота против локальных подмен Практикума и Telegram.
+
+Для каждого числа студентов запускает PollingEngine на несколько
+циклов и печатает пропускную способность опроса, задержку уведомления
+от смены статуса до доставки (p50/p99) и пиковый RSS процесса.
+Первый цикл прогревочный и в замеры не входит.
+Запуск: python benchmarks/load_test.py [--tenants 1 100 10000]
+    [--cycles N] [--latency S] [--api-errors P] [--api-429 P]
+    [--telegram-429 P] [--telegram-rate N] [--change-rate P] [--padding N]
+"""
+import argparse
+import logging
+import os
+import resource
+import sys
+import time
+
+import telegram
+from telegram.utils.request import Request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delivery import TokenBucket  # noqa: E402
+import homework  # noqa: E402
+from scheduler import Scheduler  # noqa: E402
+from stand_ins import Faults, PracticumServer, TelegramServer  # noqa: E402
+from tenants import Tenant  # noqa: E402
+
+
+BOT_TOKEN = '123456:load-test'
+ENDPOINT_PATH = '/api/user_api/homework_statuses/'
+REPORT = (
+    '{tenants:>6} tenants: {polls:>7} polls in {elapsed:6.2f} s '
+    '= {rate:9.1f} polls/s; {messages:>5} messages; '
+    'latency p50 {p50:7.3f} s, p99 {p99:7.3f} s; peak RSS {rss:6.1f} MiB'
+)
+
+
+def percentile(values, share):
+    """Возвращает перцентиль share из выборки или 0 для пустой."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+def peak_rss():
+    """Возвращает пиковый RSS процесса в мебибайтах."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(count, args):
+    """Прогоняет движок на count студентах и печатает отчёт."""
+    practicum = PracticumServer(
+        Faults(args.latency, args.api_errors, args.api_429),
+        change_rate=args.change_rate, padding=args.padding
+    )
+    telegram_server = TelegramServer(
+        practicum.changed_at,
+        Faults(args.latency, 0, args.telegram_429, seed=1)
+    )
+    homework.ENDPOINT = practicum.url + ENDPOINT_PATH
+    bot = telegram.Bot(
+        BOT_TOKEN, base_url=telegram_server.base_url,
+        request=Request(con_pool_size=homework.POLL_CONCURRENCY + 4)
+    )
+    engine = homework.PollingEngine(
+        bot, scheduler=Scheduler(base_period=0, error_period=0)
+    )
+    engine.queue.global_bucket = TokenBucket(args.telegram_rate)
+    known = {str(-index): 'approved' for index in range(1, args.padding + 1)}
+    tenants = [
+        Tenant(f'token{number}', number, timestamp=0, statuses=dict(known))
+        for number in range(count)
+    ]
+    try:
+        engine.run_cycle(tenants)
+        engine.loop.run_until_complete(engine.queue.join())
+        telegram_server.latencies.clear()
+        telegram_server.messages = 0
+        polls = 0
+        started = time.perf_counter()
+        for _ in range(args.cycles):
+            polls += len(tenants)
+            engine.run_cycle(tenants)
+        engine.loop.run_until_complete(engine.queue.join())
+        elapsed = time.perf_counter() - started
+    finally:
+        engine.close()
+        practicum.close()
+        telegram_server.close()
+    latencies = telegram_server.latencies
+    print(REPORT.format(
+        tenants=count,
+        polls=polls,
+        elapsed=elapsed,
+        rate=polls / elapsed,
+        messages=telegram_server.messages,
+        p50=percentile(latencies, 0.5),
+        p99=percentile(latencies, 0.99),
+        rss=peak_rss(),
+    ))
+
+
+def main():
+    """Запускает прогоны для каждого числа студентов."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, nargs='+',
+                        default=[1, 100, 10000])
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='задержка ответа обоих серверов, с')
+    parser.add_argument('--api-errors', type=float, default=0.01,
+                        help='доля ответов 500 от Практикума')
+    parser.add_argument('--api-429', type=float, default=0.0,
+                        help='доля ответов 429 от Практикума')
+    parser.add_argument('--telegram-429', type=float, default=0.01,
+                        help='доля ответов 429 от Telegram')
+    parser.add_argument('--telegram-rate', type=float, default=30,
+                        help='общий лимит сообщений бота в секунду')
+    parser.add_argument('--change-rate', type=float, default=0.01,
+                        help='вероятность смены статуса на каждый опрос')
+    parser.add_argument('--padding', type=int, default=5,
+                        help='неизменных работ в каждом ответе')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    for count in args.tenants:
+        run(count, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Измеряет, сколько стоит logger.debug(response) в цикле опроса.
+
+Сравнивает выключенный DEBUG, синхронный RotatingFileHandler и
+очередь logs.queued. Время считается в потоке, который пишет лог.
+Запуск: python benchmarks/logging_overhead.py [--calls N] [--homeworks N]
+"""
+import argparse
+import logging
+from logging.handlers import RotatingFileHandler
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logs  # noqa: E402
+
+
+REPORT = '{name:>12}: {per_call:8.2f} us/call'
+
+
+def make_response(homeworks):
+    """Собирает ответ API с заданным числом работ."""
+    return {
+        'homeworks': [
+            {
+                'id': number,
+                'homework_name': f'student__hw{number}.zip',
+                'status': 'approved',
+                'reviewer_comment': 'Всё нравится' * 5,
+                'date_updated': '2022-02-13T14:40:57Z',
+                'lesson_name': 'Итоговый проект',
+            }
+            for number in range(homeworks)
+        ],
+        'current_date': 1644763257,
+    }
+
+
+def measure(name, logger, response, calls):
+    """Печатает среднее время одного вызова logger.debug."""
+    started = time.perf_counter()
+    for _ in range(calls):
+        logger.debug(response)
+    per_call = (time.perf_counter() - started) * 1e6 / calls
+    print(REPORT.format(name=name, per_call=per_call))
+
+
+def main():
+    """Запускает три варианта логирования."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--homeworks', type=int, default=20)
+    args = parser.parse_args()
+    response = make_response(args.homeworks)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.log')
+
+        logger = logging.getLogger('bench.off')
+        logger.setLevel(logging.INFO)
+        with logs.queued(logger, path):
+            measure('debug off', logger, response, args.calls)
+
+        logger = logging.getLogger('bench.sync')
+        logger.setLevel(logging.DEBUG)
+        handler = RotatingFileHandler(path)
+        handler.setFormatter(logging.Formatter(logs.TEXT_FORMAT))
+        logger.addHandler(handler)
+        measure('sync file', logger, response, args.calls)
+        handler.close()
+
+        logger = logging.getLogger('bench.queued')
+        logger.setLevel(logging.DEBUG)
+        with logs.queued(logger, path):
+            measure('queued', logger, response, args.calls)
+
+
+if __name__ == '__main__':
+    main()
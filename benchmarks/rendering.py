@@ -0,0 +1,69 @@
+"""Измеряет пропускную способность сборки уведомлений о статусах.
+
+Сравнивает прямой HOMEWORK_STATUS.format, Renderer без кеша и
+Renderer с LRU-кешем на потоке уведомлений, где названия работ
+повторяются, как у студентов одного потока.
+Запуск: python benchmarks/rendering.py [--renders N] [--homeworks N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import messages  # noqa: E402
+
+
+REPORT = '{name:>14}: {rate:12,.0f} renders/s'
+HOMEWORK_STATUS = 'Изменился статус проверки работы "{0}". {1}'
+
+
+def make_stream(renders, homeworks):
+    """Собирает поток уведомлений: название, статус, язык, разметка."""
+    rng = random.Random(0)
+    names = [f'student{number}__hw{number % 15}.zip'
+             for number in range(homeworks)]
+    statuses = tuple(messages.CATALOGS['ru'].verdicts)
+    locales = tuple(messages.CATALOGS)
+    markups = tuple(messages.PARSE_MODES)
+    return [
+        (
+            rng.choice(names), rng.choice(statuses),
+            rng.choice(locales), rng.choice(markups)
+        )
+        for _ in range(renders)
+    ]
+
+
+def measure(name, render, stream):
+    """Печатает число собранных сообщений в секунду."""
+    started = time.perf_counter()
+    for item in stream:
+        render(*item)
+    rate = len(stream) / (time.perf_counter() - started)
+    print(REPORT.format(name=name, rate=rate))
+
+
+def main():
+    """Запускает три варианта сборки уведомлений."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--renders', type=int, default=200000)
+    parser.add_argument('--homeworks', type=int, default=200)
+    args = parser.parse_args()
+    stream = make_stream(args.renders, args.homeworks)
+    verdicts = messages.CATALOGS['ru'].verdicts
+
+    def direct(name, status, locale, markup):
+        return HOMEWORK_STATUS.format(name, verdicts[status])
+
+    measure('direct format', direct, stream)
+    measure('uncached', messages.Renderer(cache_size=0).status, stream)
+    renderer = messages.Renderer()
+    measure('lru cache', renderer.status, stream)
+    print(renderer.status.cache_info())
+
+
+if __name__ == '__main__':
+    main()
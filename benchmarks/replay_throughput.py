@@ -0,0 +1,92 @@
+"""Измеряет пропускную способность разбора и уведомлений без сети.
+
+Прогоняет через ReplayEngine записанные ответы API из --file или
+синтетическую запись: у каждого студента padding неизменных работ
+и одна работа, статус которой меняется с вероятностью change-rate.
+Сообщения уходят в DryRunBot, воспроизведение идёт без пауз.
+Запуск: python benchmarks/replay_throughput.py [--file PATH]
+    [--tenants N] [--rounds N] [--padding N] [--change-rate P]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+import replay  # noqa: E402
+
+
+STATUSES = ('reviewing', 'approved', 'rejected')
+REPORT = (
+    '{records:>7} responses in {elapsed:6.2f} s = {rate:9.1f} responses/s; '
+    '{messages:>6} messages; {errors} errors'
+)
+
+
+def synthesize(tenants, rounds, padding, change_rate, seed=0):
+    """Собирает синтетическую запись ответов API."""
+    generator = random.Random(seed)
+    padding_homeworks = [
+        {'id': -index, 'homework_name': f'padding{index}',
+         'status': 'approved'}
+        for index in range(1, padding + 1)
+    ]
+    statuses = {}
+    records = []
+    for round_number in range(rounds):
+        for tenant in range(tenants):
+            name = str(tenant)
+            number, status = statuses.get(name, (1, STATUSES[0]))
+            if generator.random() < change_rate:
+                number += 1
+                status = generator.choice(STATUSES)
+            statuses[name] = number, status
+            records.append(replay.Recorded(
+                name, float(round_number), round_number, 0.0, {
+                    'homeworks': [{
+                        'id': number,
+                        'homework_name': f'{name}-hw{number}',
+                        'status': status,
+                    }] + padding_homeworks,
+                    'current_date': round_number + 1,
+                }
+            ))
+    return records
+
+
+def main():
+    """Прогоняет запись и печатает отчёт."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--file', help='запись RECORD_FILE для прогона')
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--padding', type=int, default=5,
+                        help='неизменных работ в каждом ответе')
+    parser.add_argument('--change-rate', type=float, default=0.05,
+                        help='вероятность смены статуса на каждый ответ')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    if args.file:
+        records = replay.read_records(args.file)
+    else:
+        records = synthesize(
+            args.tenants, args.rounds, args.padding, args.change_rate
+        )
+    bot = replay.DryRunBot()
+    engine = homework.ReplayEngine(bot, records, speed=0)
+    try:
+        stats = engine.replay()
+    finally:
+        engine.shutdown()
+    print(REPORT.format(
+        rate=stats['records'] / stats['elapsed'],
+        messages=len(bot.sent),
+        **stats
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""Локальные подмены API Практикума и Telegram Bot API для нагрузки.
+
+Оба сервера умеют отвечать с задержкой, ошибками и 429, а сервер
+Практикума — отдавать ответы заданного размера. Сервер Telegram
+по названиям работ в тексте сообщения считает задержку уведомления
+от смены статуса до доставки.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+
+STATUSES = ('reviewing', 'approved', 'rejected')
+HOMEWORK_NAME = '{token}-hw{number}'
+NAME_PATTERN = re.compile(r'"([^"\s]+-hw\d+)"')
+PADDING_COMMENT = 'Ревьюер оставил подробный комментарий к работе. ' * 4
+TOO_MANY_REQUESTS = 'Too Many Requests: retry after {0}'
+
+
+class Faults:
+    """Задержка и доли ошибочных ответов сервера."""
+
+    def __init__(self, latency=0.0, error_rate=0.0, throttle_rate=0.0,
+                 retry_after=1, seed=0):
+        """Запоминает задержку в секундах и доли 5xx и 429."""
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self):
+        """Выбирает исход запроса: None, 'error' или 'throttle'."""
+        with self.lock:
+            value = self.random.random()
+        if value < self.error_rate:
+            return 'error'
+        if value < self.error_rate + self.throttle_rate:
+            return 'throttle'
+        return None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Общая часть обработчиков: keep-alive, JSON и тишина в stderr."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def send_json(self, status, data, headers=()):
+        """Отправляет ответ JSON с указанным кодом."""
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Не пишет в stderr на каждый запрос."""
+
+
+class StandInServer(ThreadingHTTPServer):
+    """HTTP-сервер в фоновом потоке на свободном порту."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, handler, faults):
+        """Запускает сервер на 127.0.0.1."""
+        super().__init__(('127.0.0.1', 0), handler)
+        self.faults = faults
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        """Возвращает корневой адрес сервера."""
+        return f'http://127.0.0.1:{self.server_port}'
+
+    def close(self):
+        """Останавливает сервер."""
+        self.shutdown()
+        self.server_close()
+
+
+class PracticumHandler(StandInHandler):
+    """Отвечает как homework_statuses."""
+
+    def do_GET(self):
+        """Отдаёт работы студента по токену из заголовка Authorization."""
+        server = self.server
+        time.sleep(server.faults.latency)
+        outcome = server.faults.draw()
+        if outcome == 'error':
+            self.send_json(500, {'message': 'stand-in failure'})
+            return
+        if outcome == 'throttle':
+            self.send_json(429, {'message': 'rate limited'}, (
+                ('Retry-After', str(server.faults.retry_after)),
+            ))
+            return
+        token = self.headers.get('Authorization', '').split()[-1]
+        query = parse_qs(urlsplit(self.path).query)
+        self.send_json(200, server.answer(
+            token, int(query.get('from_date', ['0'])[0])
+        ))
+
+
+class PracticumServer(StandInServer):
+    """Подмена API Практикума.
+
+    У каждого студента padding неизменных работ и одна работа,
+    статус которой меняется с вероятностью change_rate на каждый
+    запрос. Время смены запоминается в changed_at по названию работы.
+    """
+
+    def __init__(self, faults=None, change_rate=0.01, padding=0):
+        """Запускает сервер с пустым состоянием студентов."""
+        super().__init__(PracticumHandler, faults or Faults())
+        self.change_rate = change_rate
+        self.padding = padding
+        self.changed_at = {}
+        self._homeworks = {}
+        self._random = random.Random(1)
+
+    def answer(self, token, from_date):
+        """Собирает ответ API для студента."""
+        with self.lock:
+            number, status = self._homeworks.get(token, (0, STATUSES[0]))
+            if self._random.random() < self.change_rate:
+                number += 1
+                status = self._random.choice(STATUSES)
+                self.changed_at[
+                    HOMEWORK_NAME.format(token=token, number=number)
+                ] = time.monotonic()
+            self._homeworks[token] = (number, status)
+        homeworks = []
+        if number:
+            homeworks.append({
+                'id': number,
+                'homework_name': HOMEWORK_NAME.format(
+                    token=token, number=number
+                ),
+                'status': status,
+            })
+        homeworks.extend(
+            {
+                'id': -index,
+                'homework_name': f'{token}-padding{index}',
+                'status': 'approved',
+                'reviewer_comment': PADDING_COMMENT,
+            }
+            for index in range(1, self.padding + 1)
+        )
+        return {'homeworks': homeworks, 'current_date': int(time.time())}
+
+
+class TelegramHandler(StandInHandler):
+    """Отвечает как метод sendMessage Bot API."""
+
+    def do_POST(self):
+        """Принимает сообщение и записывает задержки уведомлений."""
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length) or b'{}')
+        time.sleep(server.faults.latency)
+        outcome = server.faults.draw()
+        if outcome == 'error':
+            self.send_json(500, {
+                'ok': False, 'error_code': 500,
+                'description': 'Internal Server Error'
+            })
+            return
+        if outcome == 'throttle':
+            retry_after = server.faults.retry_after
+            self.send_json(429, {
+                'ok': False, 'error_code': 429,
+                'description': TOO_MANY_REQUESTS.format(retry_after),
+                'parameters': {'retry_after': retry_after},
+            })
+            return
+        server.received(data.get('text', ''))
+        self.send_json(200, {'ok': True, 'result': {
+            'message_id': 1,
+            'date': int(time.time()),
+            'chat': {'id': int(data.get('chat_id', 0)), 'type': 'private'},
+            'text': data.get('text', ''),
+        }})
+
+
+class TelegramServer(StandInServer):
+    """Подмена Telegram Bot API, считающая задержки уведомлений."""
+
+    def __init__(self, changed_at, faults=None):
+        """Принимает словарь времён смены статусов сервера Практикума."""
+        super().__init__(TelegramHandler, faults or Faults())
+        self.changed_at = changed_at
+        self.messages = 0
+        self.latencies = []
+
+    def received(self, text):
+        """Учитывает доставленное сообщение."""
+        now = time.monotonic()
+        with self.lock:
+            self.messages += 1
+            for name in NAME_PATTERN.findall(text):
+                changed_at = self.changed_at.get(name)
+                if changed_at is not None:
+                    self.latencies.append(now - changed_at)
+
+    @property
+    def base_url(self):
+        """Возвращает base_url для telegram.Bot."""
+        return f'{self.url}/bot'
@@ -0,0 +1,123 @@
+import re
+
+from messages import CATALOGS, DEFAULT_LOCALE
+
+
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 300
+DIGEST_INTERVAL = 3600
+CIRCUIT_OPEN = 'API calls paused for {0:.0f} s after repeated failures'
+
+BRACES = re.compile(r'\{[^{}]*\}')
+NUMBERS = re.compile(r'\d+')
+
+
+class CircuitOpen(Exception):
+    """API calls are paused by the circuit breaker."""
+
+
+def fingerprint(error):
+    """Возвращает отпечаток ошибки без чисел и параметров запроса."""
+    return type(error).__name__, NUMBERS.sub(
+        '#', BRACES.sub('{}', str(error))
+    )
+
+
+class CircuitBreaker:
+    """Размыкатель: пауза в запросах к API после серии отказов.
+
+    После threshold отказов подряд запросы не делаются reset_timeout
+    секунд, затем пропускается один пробный запрос. Успех замыкает
+    цепь, отказ снова размыкает её, а любой другой исход пробного
+    запроса позволяет сделать новую пробу.
+    """
+
+    def __init__(self, threshold=FAILURE_THRESHOLD,
+                 reset_timeout=RESET_TIMEOUT, errors=(Exception,),
+                 counts=None):
+        """Запоминает порог отказов и ошибки, которые считаются отказами.
+
+        counts(error) решает, считать ли ошибку отказом; по умолчанию
+        отказ — любая ошибка из errors.
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.errors = errors
+        self.counts = counts
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def check(self, now):
+        """Бросает CircuitOpen, если запрос к API сейчас делать нельзя."""
+        if self.opened_at is None:
+            return
+        left = self.opened_at + self.reset_timeout - now
+        if left > 0 or self.trial:
+            raise CircuitOpen(CIRCUIT_OPEN.format(max(left, 0)))
+        self.trial = True
+
+    def is_failure(self, error):
+        """Сообщает, считается ли ошибка отказом."""
+        if self.counts is not None:
+            return self.counts(error)
+        return isinstance(error, self.errors)
+
+    def record(self, now, error=None):
+        """Учитывает итог запроса к API."""
+        if error is None:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+            return
+        if not self.is_failure(error):
+            self.trial = False
+            return
+        self.failures += 1
+        if self.trial or self.failures >= self.threshold:
+            self.opened_at = now
+            self.trial = False
+
+
+class ErrorDigest:
+    """Подавляет повторы одной и той же ошибки в уведомлениях.
+
+    Первая ошибка отправляется сразу, повторы только считаются. Сводка
+    с их числом уходит раз в interval секунд и когда ошибка проходит.
+    """
+
+    def __init__(self, interval=DIGEST_INTERVAL):
+        """Создаёт пустой журнал ошибок студентов."""
+        self.interval = interval
+        self._errors = {}
+
+    def report(self, name, error, message, now,
+               template=CATALOGS[DEFAULT_LOCALE].repeated_error):
+        """Возвращает текст уведомления об ошибке или None для повтора.
+
+        template — шаблон сводки повторов на языке студента.
+        """
+        key = fingerprint(error)
+        last = self._errors.get(name)
+        if last is None or last['key'] != key:
+            self._errors[name] = {
+                'key': key, 'message': message, 'count': 0, 'sent_at': now
+            }
+            return message
+        last['count'] += 1
+        if now - last['sent_at'] < self.interval:
+            return None
+        text = template.format(**last)
+        last['count'] = 0
+        last['sent_at'] = now
+        return text
+
+    def resolve(self, name, template=CATALOGS[DEFAULT_LOCALE].error_cleared):
+        """Забывает ошибку студента и возвращает сводку, если были повторы.
+
+        template — шаблон сводки на языке студента.
+        """
+        last = self._errors.pop(name, None)
+        if last is None or not last['count']:
+            return None
+        return template.format(**last)
@@ -0,0 +1,186 @@
+from collections import deque
+from functools import partial
+import logging
+import time
+
+from lazy import LazyModule
+import messages
+
+asyncio = LazyModule('asyncio')
+
+
+HISTORY_SIZE = 10
+LONG_POLL_TIMEOUT = 10
+ERROR_PAUSE = 5
+
+STATUS_LINE = '{name}: {verdict}'
+GET_UPDATES_ERROR_LOG = 'Failed to get Telegram updates'
+COMMAND_LOG = 'Command {0} from {1!r}'
+
+logger = logging.getLogger(__name__)
+
+
+class History:
+    """Последние изменения статусов работ по студентам."""
+
+    def __init__(self, size=HISTORY_SIZE):
+        """Создаёт пустую историю на size записей для студента."""
+        self.size = size
+        self._records = {}
+        self._names = {}
+
+    def record(self, name, homework, message_id=None, sent_at=None):
+        """Запоминает доставленное изменение статуса работы.
+
+        Номер сообщения и время отправки в памяти не хранятся.
+        """
+        self._records.setdefault(name, deque(maxlen=self.size)).append(
+            homework
+        )
+        self._names.setdefault(name, {})[homework.key] = homework.name
+
+    def get(self, name):
+        """Возвращает изменения студента от старых к новым."""
+        return list(self._records.get(name, ()))
+
+    def homework_name(self, name, key):
+        """Возвращает название работы или её ключ, если название неизвестно."""
+        return self._names.get(name, {}).get(key, key)
+
+    def flush_if_due(self):
+        """Истории в памяти нечего сбрасывать."""
+
+    def close(self):
+        """Истории в памяти нечего закрывать."""
+
+
+class CommandHandler:
+    """Отвечает на команды из чатов студентов через getUpdates.
+
+    Ответы собираются из состояния в памяти, API Практикума для них не
+    вызывается. Сообщения из чатов, которых нет среди студентов,
+    игнорируются.
+    """
+
+    def __init__(self, bot, scheduler, queue, history, renderer, options):
+        """Запоминает бота, планировщик, очередь отправки и историю.
+
+        options(tenant) возвращает язык и разметку ответов студенту.
+        """
+        self.bot = bot
+        self.scheduler = scheduler
+        self.queue = queue
+        self.history = history
+        self.renderer = renderer
+        self.options = options
+        self.offset = None
+        self.poll_requested = False
+        self.commands = {
+            '/status': self.status,
+            '/history': self.show_history,
+            '/pause': self.pause,
+            '/resume': self.resume,
+        }
+
+    def catalog(self, tenant):
+        """Возвращает каталог текстов на языке студента без разметки.
+
+        Разметка накладывается на готовый ответ целиком в handle.
+        """
+        return self.renderer.catalog(self.options(tenant)[0], messages.PLAIN)
+
+    def verdict_line(self, tenant, key, status):
+        """Возвращает строку со статусом одной работы."""
+        verdicts = self.catalog(tenant).verdicts
+        return STATUS_LINE.format(
+            name=(
+                tenant.names.get(key)
+                or self.history.homework_name(tenant.name, key)
+            ),
+            verdict=verdicts.get(status, status)
+        )
+
+    def status(self, tenant):
+        """Возвращает последние известные статусы работ студента."""
+        if not tenant.statuses:
+            return self.catalog(tenant).no_statuses
+        return '\n'.join(
+            self.verdict_line(tenant, key, status)
+            for key, status in tenant.statuses.items()
+        )
+
+    def show_history(self, tenant):
+        """Возвращает последние изменения статусов работ студента."""
+        records = self.history.get(tenant.name)
+        if not records:
+            return self.catalog(tenant).no_history
+        return '\n'.join(
+            self.verdict_line(tenant, homework.key, homework.status)
+            for homework in records
+        )
+
+    def pause(self, tenant):
+        """Приостанавливает опрос API для студента."""
+        catalog = self.catalog(tenant)
+        if self.scheduler.pause(tenant.name):
+            return catalog.paused
+        return catalog.already_paused
+
+    def resume(self, tenant):
+        """Возобновляет опрос API для студента.
+
+        Приём команд прерывается, чтобы первый опрос прошёл сразу.
+        """
+        catalog = self.catalog(tenant)
+        if self.scheduler.resume(tenant.name, time.monotonic()):
+            self.poll_requested = True
+            return catalog.resumed
+        return catalog.not_paused
+
+    def answer(self, tenant, text):
+        """Возвращает ответ на текст команды."""
+        command = text.split(maxsplit=1)[0].split('@', 1)[0].lower()
+        handler = self.commands.get(command)
+        if handler is None:
+            return self.catalog(tenant).help
+        return handler(tenant)
+
+    async def handle(self, tenants, update):
+        """Отвечает на одно обновление Telegram."""
+        message = update.message
+        if message is None or not message.text:
+            return
+        chats = {str(tenant.chat_id): tenant for tenant in tenants}
+        tenant = chats.get(str(message.chat_id))
+        if tenant is None:
+            return
+        logger.debug(COMMAND_LOG.format(message.text, tenant))
+        await self.queue.put(tenant, messages.escape(
+            self.answer(tenant, message.text), self.options(tenant)[1]
+        ))
+
+    async def serve(self, tenants, seconds):
+        """Принимает и обрабатывает команды в течение seconds секунд.
+
+        Возвращается раньше, если команда потребовала опроса сейчас.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + seconds
+        self.poll_requested = False
+        while not self.poll_requested:
+            left = deadline - time.monotonic()
+            timeout = int(min(left, LONG_POLL_TIMEOUT))
+            if timeout < 1:
+                await asyncio.sleep(max(left, 0))
+                return
+            try:
+                updates = await loop.run_in_executor(None, partial(
+                    self.bot.get_updates, offset=self.offset, timeout=timeout
+                ))
+            except Exception:
+                logger.exception(GET_UPDATES_ERROR_LOG)
+                await asyncio.sleep(min(ERROR_PAUSE, max(left, 0)))
+                continue
+            for update in updates:
+                self.offset = update.update_id + 1
+                await self.handle(tenants, update)
@@ -0,0 +1,67 @@
+from collections import namedtuple
+import hashlib
+import re
+
+
+DIGEST_SIZE = 16
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*-?\d+')
+
+Validators = namedtuple('Validators', ('etag', 'last_modified', 'digest'))
+
+
+def body_digest(content):
+    """Возвращает хеш тела ответа без поля current_date.
+
+    current_date — время сервера, оно меняется в каждом ответе,
+    поэтому в сравнение тел не входит.
+    """
+    return hashlib.blake2b(
+        CURRENT_DATE.sub(b'', content), digest_size=DIGEST_SIZE
+    ).digest()
+
+
+def validators(response):
+    """Собирает ETag, Last-Modified и хеш тела ответа."""
+    return Validators(
+        response.headers.get('ETag'),
+        response.headers.get('Last-Modified'),
+        body_digest(response.content),
+    )
+
+
+class ResponseCache:
+    """Валидаторы последнего обработанного ответа API по студентам.
+
+    Если сервер отдаёт ETag или Last-Modified, следующий запрос
+    становится условным и может вернуть 304. Иначе совпадение хеша
+    тела позволяет не разбирать JSON повторно.
+    """
+
+    def __init__(self):
+        """Создаёт пустой кеш."""
+        self._entries = {}
+
+    def headers(self, name):
+        """Возвращает заголовки условного запроса для студента."""
+        entry = self._entries.get(name)
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def unchanged(self, name, response_validators):
+        """Проверяет, совпадает ли тело ответа с последним обработанным."""
+        entry = self._entries.get(name)
+        return entry is not None and entry.digest == response_validators.digest
+
+    def remember(self, name, response_validators):
+        """Запоминает валидаторы полностью обработанного ответа."""
+        self._entries[name] = response_validators
+
+    def forget(self, name):
+        """Забывает ответ студента, следующий запрос будет полным."""
+        self._entries.pop(name, None)
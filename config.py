@@ -0,0 +1,236 @@
+import csv
+import json
+import os
+import sqlite3
+
+import messages
+from tenants import Tenant
+
+
+SQLITE_TABLE = 'tenants'
+UNREADABLE = 'Config {0} is unreadable: {1}'
+UNKNOWN_FORMAT = 'Unknown config format {0!r}'
+YAML_MISSING = 'PyYAML is required to read {0}'
+TOML_MISSING = 'Python 3.11+ with tomllib is required to read {0}'
+NOT_A_LIST = 'Config {0} must hold a list of tenants'
+CONFIG_PROBLEMS = 'Config has {0} bad entries:\n{1}'
+ENTRY_PROBLEM = 'entry {0}: {1}'
+NOT_A_MAPPING = 'not a mapping'
+BAD_TOKEN = 'token must be a non-empty string'
+BAD_CHAT_ID = 'chat_id must be an integer or @channel, got {0!r}'
+DUPLICATE_NAME = 'name {0!r} repeats entry {1}'
+BAD_LOCALE = 'locale {0!r} is not one of {1}'
+BAD_MARKUP = 'markup {0!r} is not one of {1}'
+BAD_PERIOD = 'period must be a positive number, got {0!r}'
+
+
+class ConfigError(ValueError):
+    """Tenant config is unreadable or has bad entries."""
+
+    def __init__(self, message, problems=()):
+        """Запоминает список всех найденных проблем."""
+        super().__init__(message)
+        self.problems = list(problems)
+
+
+def _read_json(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _read_yaml(path):
+    try:
+        import yaml
+    except ImportError:
+        raise ConfigError(YAML_MISSING.format(path))
+    with open(path, encoding='utf-8') as file:
+        try:
+            return yaml.safe_load(file)
+        except yaml.YAMLError as error:
+            raise ConfigError(UNREADABLE.format(path, error))
+
+
+def _read_toml(path):
+    try:
+        import tomllib
+    except ImportError:
+        raise ConfigError(TOML_MISSING.format(path))
+    with open(path, 'rb') as file:
+        return tomllib.load(file)
+
+
+def _read_csv(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return [
+            {key: value or None for key, value in row.items()}
+            for row in csv.DictReader(file)
+        ]
+
+
+def _read_sqlite(path):
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        return [
+            dict(row)
+            for row in connection.execute(f'SELECT * FROM {SQLITE_TABLE}')
+        ]
+    finally:
+        connection.close()
+
+
+READERS = {
+    '.json': _read_json,
+    '.yaml': _read_yaml,
+    '.yml': _read_yaml,
+    '.toml': _read_toml,
+    '.csv': _read_csv,
+    '.db': _read_sqlite,
+    '.sqlite': _read_sqlite,
+    '.sqlite3': _read_sqlite,
+}
+
+
+def read_records(path):
+    """Читает записи студентов из файла, формат — по расширению.
+
+    Понимает JSON, YAML, TOML, CSV и таблицу tenants в SQLite.
+    Верхний уровень — список записей или словарь с ключом tenants.
+    Ошибки разбора файла превращаются в ConfigError.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ConfigError(UNKNOWN_FORMAT.format(extension))
+    try:
+        data = READERS[extension](path)
+    except ConfigError:
+        raise
+    except (ValueError, csv.Error, sqlite3.Error) as error:
+        raise ConfigError(UNREADABLE.format(path, error))
+    if isinstance(data, dict):
+        data = data.get('tenants')
+    if not isinstance(data, list):
+        raise ConfigError(NOT_A_LIST.format(path))
+    return data
+
+
+def _chat_id(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        if value.lstrip('-').isdigit():
+            return int(value)
+        if value.startswith('@') and len(value) > 1:
+            return value
+    raise ValueError(BAD_CHAT_ID.format(value))
+
+
+def _period(value):
+    if value is None:
+        return None
+    try:
+        period = float(value)
+    except (TypeError, ValueError):
+        period = 0
+    if isinstance(value, bool) or not period > 0:
+        raise ValueError(BAD_PERIOD.format(value))
+    return period
+
+
+def _name(record):
+    if record.get('name'):
+        return str(record['name'])
+    try:
+        return str(_chat_id(record.get('chat_id')))
+    except ValueError:
+        return str(record.get('chat_id'))
+
+
+def _field_problems(record, locales):
+    token = record.get('token')
+    if not isinstance(token, str) or not token.strip():
+        yield BAD_TOKEN
+    try:
+        _chat_id(record.get('chat_id'))
+    except ValueError as error:
+        yield str(error)
+    locale = record.get('locale')
+    if locale is not None and locale not in locales:
+        yield BAD_LOCALE.format(locale, sorted(locales))
+    markup = record.get('markup')
+    if markup is not None and markup not in messages.PARSE_MODES:
+        yield BAD_MARKUP.format(markup, sorted(messages.PARSE_MODES))
+    try:
+        _period(record.get('period'))
+    except ValueError as error:
+        yield str(error)
+
+
+def validate(records, locales=messages.CATALOGS):
+    """Проверяет все записи за один проход.
+
+    Не останавливается на первой ошибке: собирает проблемы всех
+    записей и бросает ConfigError со всем списком сразу.
+    """
+    problems = []
+    names = {}
+    for number, record in enumerate(records, 1):
+        if not isinstance(record, dict):
+            problems.append(ENTRY_PROBLEM.format(number, NOT_A_MAPPING))
+            continue
+        problems.extend(
+            ENTRY_PROBLEM.format(number, problem)
+            for problem in _field_problems(record, locales)
+        )
+        name = _name(record)
+        if name in names:
+            problems.append(ENTRY_PROBLEM.format(
+                number, DUPLICATE_NAME.format(name, names[name])
+            ))
+        names.setdefault(name, number)
+    if problems:
+        raise ConfigError(
+            CONFIG_PROBLEMS.format(len(problems), '\n'.join(problems)),
+            problems
+        )
+
+
+def load_tenants(path, locales=messages.CATALOGS):
+    """Читает, проверяет и превращает записи файла в студентов."""
+    records = read_records(path)
+    validate(records, locales)
+    return [
+        Tenant(
+            record['token'].strip(),
+            _chat_id(record['chat_id']),
+            name=_name(record),
+            locale=record.get('locale'),
+            markup=record.get('markup'),
+            period=_period(record.get('period'))
+        )
+        for record in records
+    ]
+
+
+class ConfigWatcher:
+    """Замечает изменения файла конфигурации по времени и размеру."""
+
+    def __init__(self, path):
+        """Запоминает текущую версию файла."""
+        self.path = path
+        self.version = self._version()
+
+    def _version(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self):
+        """Сообщает, менялся ли файл с прошлой проверки."""
+        version = self._version()
+        if version == self.version:
+            return False
+        self.version = version
+        return True
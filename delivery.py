@@ -0,0 +1,161 @@
+from collections import Counter
+import logging
+import time
+
+from lazy import LazyModule
+
+asyncio = LazyModule('asyncio')
+telegram = LazyModule('telegram')
+
+
+CHAT_RATE = 1
+GLOBAL_RATE = 30
+MAX_MESSAGE_LENGTH = 4096
+MAX_RETRIES = 3
+LINES_SEPARATOR = '\n\n'
+RETRY_AFTER_LOG = 'Telegram asked to retry chat {0} in {1} s'
+DELIVERY_FAILED_LOG = 'Failed to deliver a message to chat {0}'
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Ведро токенов: не больше rate событий в секунду."""
+
+    def __init__(self, rate, capacity=None):
+        """Создаёт полное ведро."""
+        self.rate = rate
+        self.capacity = max(1, rate) if capacity is None else capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self):
+        """Забирает токен и возвращает, сколько секунд ждать его выдачи."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.tokens -= 1
+        return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def split_text(lines, limit=MAX_MESSAGE_LENGTH):
+    """Склеивает строки в сообщения не длиннее limit символов.
+
+    Возвращает пары (текст, количество вошедших строк).
+    """
+    chunks = []
+    text, count = '', 0
+    for line in lines:
+        candidate = line if not count else text + LINES_SEPARATOR + line
+        if count and len(candidate) > limit:
+            chunks.append((text, count))
+            candidate, count = line, 0
+        text, count = candidate, count + 1
+    if count:
+        chunks.append((text, count))
+    return chunks
+
+
+class DeliveryQueue:
+    """Очередь исходящих сообщений Telegram.
+
+    Строки для одного чата, накопившиеся к моменту отправки, уходят одним
+    сообщением. Отправка ограничена ведром токенов на чат и общим ведром
+    на бота, а ответ RetryAfter откладывает повтор на указанное время.
+    """
+
+    def __init__(self, send, chat_rate=CHAT_RATE, global_rate=GLOBAL_RATE,
+                 max_retries=MAX_RETRIES):
+        """Принимает корутину send(recipient, text) и лимиты скорости."""
+        self.send = send
+        self.chat_rate = chat_rate
+        self.max_retries = max_retries
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_buckets = {}
+        self.counters = Counter()
+        self.started = time.monotonic()
+        self._pending = {}
+        self._workers = {}
+
+    def put(self, recipient, text):
+        """Ставит строку в очередь чата получателя.
+
+        Возвращает future с результатом send после доставки строки
+        или False, если доставить её не удалось.
+        """
+        future = asyncio.get_running_loop().create_future()
+        chat_id = recipient.chat_id
+        self._pending.setdefault(chat_id, []).append(
+            (recipient, text, future)
+        )
+        self.counters['lines'] += 1
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.ensure_future(
+                self._drain_chat(chat_id)
+            )
+        return future
+
+    async def join(self):
+        """Ждёт, пока очередь опустеет."""
+        while self._workers:
+            await asyncio.gather(*list(self._workers.values()))
+
+    def pending(self):
+        """Возвращает число строк, ещё не взятых в отправку."""
+        return sum(map(len, self._pending.values()))
+
+    def throughput(self):
+        """Возвращает среднее число отправленных сообщений в секунду."""
+        return self.counters['messages'] / max(
+            time.monotonic() - self.started, 1e-9
+        )
+
+    async def _drain_chat(self, chat_id):
+        try:
+            while self._pending.get(chat_id):
+                items = self._pending.pop(chat_id)
+                offset = 0
+                for text, count in split_text(item[1] for item in items):
+                    batch = items[offset:offset + count]
+                    offset += count
+                    delivered = await self._send(batch[0][0], text)
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_result(delivered or False)
+                    if delivered:
+                        self.counters['merged_lines'] += count - 1
+                    else:
+                        self.counters['failed'] += 1
+        finally:
+            del self._workers[chat_id]
+
+    async def _throttle(self, chat_id):
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate)
+        wait = max(bucket.reserve(), self.global_bucket.reserve())
+        if wait:
+            self.counters['throttled'] += 1
+            await asyncio.sleep(wait)
+
+    async def _send(self, recipient, text):
+        for _ in range(self.max_retries + 1):
+            await self._throttle(recipient.chat_id)
+            try:
+                delivered = await self.send(recipient, text)
+            except telegram.error.RetryAfter as error:
+                self.counters['retries'] += 1
+                logger.warning(RETRY_AFTER_LOG.format(
+                    recipient.chat_id, error.retry_after
+                ))
+                await asyncio.sleep(error.retry_after)
+                continue
+            except Exception:
+                logger.exception(DELIVERY_FAILED_LOG.format(recipient.chat_id))
+                return False
+            if delivered:
+                self.counters['messages'] += 1
+            return delivered
+        return False
@@ -0,0 +1,97 @@
+from email.utils import parsedate_to_datetime
+import time
+
+
+REDACTED = '***'
+SECRET_HEADERS = frozenset(('authorization', 'proxy-authorization', 'cookie'))
+
+
+def redact(headers):
+    """Возвращает копию заголовков, в которой секреты скрыты.
+
+    Схема авторизации остаётся видна: OAuth *** вместо токена.
+    """
+    redacted = {}
+    for name, value in (headers or {}).items():
+        if name.lower() in SECRET_HEADERS:
+            scheme, _, secret = str(value).partition(' ')
+            value = f'{scheme} {REDACTED}' if secret else REDACTED
+        redacted[name] = value
+    return redacted
+
+
+def parse_retry_after(value, now=None):
+    """Возвращает Retry-After в секундах или None, если его не разобрать."""
+    if value is None:
+        return None
+    try:
+        return max(0, int(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0, round(moment.timestamp() - now))
+
+
+class APIError(Exception):
+    """Failed call to the Practicum API.
+
+    Carries the request and response details as fields, with secret
+    headers already redacted.
+    """
+
+    template = (
+        'API call failed: url={0.url}; params={0.params}; headers={0.headers}'
+    )
+
+    def __init__(self, url, params=None, headers=None, status=None,
+                 latency=None, retry_after=None, detail=None):
+        """Запоминает поля ошибки и собирает из них сообщение."""
+        self.url = url
+        self.params = params
+        self.headers = redact(headers)
+        self.status = status
+        self.latency = latency
+        self.retry_after = retry_after
+        self.detail = detail
+        super().__init__(self.template.format(self))
+
+
+class APIConnectionError(APIError, ConnectionError):
+    """The API could not be reached."""
+
+    template = (
+        'Some troubles with url={0.url}; params={0.params}; '
+        'headers={0.headers}; caused error {0.detail}'
+    )
+
+
+class APIEndpointError(APIError):
+    """Bad answer from API Endpoint."""
+
+    template = (
+        'Bad answer from API Endpoint. Some troubles with '
+        'url={0.url}; params={0.params}; headers={0.headers}; '
+        'caused status code {0.status}'
+    )
+
+
+class APIRateLimited(APIEndpointError):
+    """The API asked to slow down with 429 Too Many Requests."""
+
+    template = (
+        'API rate limit hit: url={0.url}; params={0.params}; '
+        'headers={0.headers}; retry after {0.retry_after} s'
+    )
+
+
+class APIResponseError(APIError, ValueError):
+    """The API reported an error in the response body."""
+
+    template = (
+        'Got error in JSON: {0.detail}. Requested url={0.url}; '
+        'params={0.params}; headers={0.headers};'
+    )
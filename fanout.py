@@ -0,0 +1,93 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+import time
+
+
+WORKERS = 10
+TASK_TIMEOUT = 60
+TASK_TIMED_OUT = 'Task for {0!r} did not finish in {1} s'
+
+
+class FanOutRunner:
+    """Раздаёт синхронную задачу по элементам в ограниченный пул потоков.
+
+    Результаты выдаются в порядке завершения. Задача, которая работает
+    дольше timeout секунд, выдаётся с TimeoutError и дальше не
+    ждётся: поток освободится, когда она вернётся сама.
+    """
+
+    def __init__(self, task, workers=WORKERS, timeout=TASK_TIMEOUT):
+        """Создаёт пул из workers потоков для task(item)."""
+        self.task = task
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(workers)
+        self._futures = set()
+
+    def _submit(self, item):
+        started = []
+
+        def call():
+            started.append(time.monotonic())
+            return self.task(item)
+
+        future = self.executor.submit(copy_context().run, call)
+        self._futures.add(future)
+        return future, started
+
+    def run(self, items):
+        """Выдаёт тройки (элемент, результат, ошибка) по мере готовности.
+
+        Если перебор прервать, ещё не начатые задачи отменяются.
+        """
+        self._futures = {
+            future for future in self._futures if not future.done()
+        }
+        tasks = {}
+        for item in items:
+            future, started = self._submit(item)
+            tasks[future] = (item, started)
+        try:
+            yield from self._collect(tasks)
+        finally:
+            for future in tasks:
+                future.cancel()
+
+    def _collect(self, tasks):
+        pending = set(tasks)
+        while pending:
+            now = time.monotonic()
+            deadlines = [
+                started[0] + self.timeout
+                for item, started in map(tasks.get, pending) if started
+            ]
+            done, pending = wait(
+                pending,
+                timeout=(
+                    max(0, min(deadlines) - now) if deadlines
+                    else self.timeout
+                ),
+                return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                item = tasks[future][0]
+                error = future.exception()
+                yield item, None if error else future.result(), error
+            now = time.monotonic()
+            for future in list(pending):
+                item, started = tasks[future]
+                if started and now - started[0] >= self.timeout:
+                    pending.discard(future)
+                    yield item, None, TimeoutError(
+                        TASK_TIMED_OUT.format(item, self.timeout)
+                    )
+
+    def close(self, timeout=0):
+        """Отменяет невзятые задачи и ждёт начатые не дольше timeout секунд.
+
+        Задачи, не успевшие за timeout, дорабатывают в своих потоках.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        running = [future for future in self._futures if not future.done()]
+        if running and timeout:
+            wait(running, timeout)
+        self._futures = set()
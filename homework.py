@@ -1,27 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
 import logging
-from logging.handlers import RotatingFileHandler
 import os
 import time
 
-from dotenv import load_dotenv
-import requests
-import telegram
+from breaker import CircuitBreaker, CircuitOpen, ErrorDigest
+from commands import CommandHandler
+from delivery import DeliveryQueue, MAX_RETRIES, RETRY_AFTER_LOG
+import fanout
+from errors import (
+    APIConnectionError, APIEndpointError, APIError, APIRateLimited,
+    APIResponseError, parse_retry_after
+)
+import conditional
+import config
+import http_client
+import journal
+from lazy import LazyModule
+import logs
+import messages
+import metrics
+import replay
+from scheduler import Scheduler
+from schema import Homework, ResponseValidator
+import sharding
+from shutdown import GracefulExit, ShutdownSignal
+import state
+from streaming import CHUNK_SIZE, StreamedResponse
+from tenants import CURRENT_TENANT, Tenant, TenantRegistry
 
+asyncio = LazyModule('asyncio')
+requests = LazyModule('requests')
+telegram = LazyModule('telegram')
 
-load_dotenv()
+ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+if os.path.exists(ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
 
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+TENANTS_FILE = os.getenv('TENANTS_FILE')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES') == '1'
+CONDITIONAL_REQUESTS = os.getenv('CONDITIONAL_REQUESTS') == '1'
+COMMANDS = os.getenv('COMMANDS') == '1'
+MESSAGE_LOCALE = os.getenv('MESSAGE_LOCALE', messages.DEFAULT_LOCALE)
+MESSAGE_MARKUP = os.getenv('MESSAGE_MARKUP', messages.PLAIN)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
+LOG_JSON = os.getenv('LOG_FORMAT') == 'json'
+WORKER_NAME = os.getenv('WORKER_NAME')
+WORKERS = os.getenv('WORKERS', '').split(',')
+HEALTH_FD = os.getenv('HEALTH_FD')
+LOG_FILE = __file__ + (f'.{WORKER_NAME}.log' if WORKER_NAME else '.log')
+STATE_BACKEND = os.getenv('STATE_BACKEND', 'memory')
+STATE_PATH = os.getenv('STATE_PATH')
+HISTORY_PATH = os.getenv('HISTORY_PATH')
+HISTORY_RETENTION = float(os.getenv('HISTORY_RETENTION', 0)) or None
+RECORD_FILE = os.getenv('RECORD_FILE')
+REPLAY_FILE = os.getenv('REPLAY_FILE')
+REPLAY_SPEED = float(os.getenv('REPLAY_SPEED', 1))
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 25))
+POLL_RUNNER = os.getenv('POLL_RUNNER', 'asyncio')
+POLL_TASK_TIMEOUT = float(os.getenv('POLL_TASK_TIMEOUT', fanout.TASK_TIMEOUT))
 
 TOKENS_NAMES = [
     'PRACTICUM_TOKEN',
     'TELEGRAM_TOKEN',
     'TELEGRAM_CHAT_ID',
 ]
+SINGLE_TENANT_TOKENS_NAMES = ['PRACTICUM_TOKEN', 'TELEGRAM_CHAT_ID']
 
 RETRY_PERIOD = 600
+NOT_MODIFIED = 304
+TOO_MANY_REQUESTS = 429
+RETRY_AFTER_STATUSES = (TOO_MANY_REQUESTS, 503)
+POLL_CONCURRENCY = 10
+HTTP_POOL_SIZE = POLL_CONCURRENCY
+HTTP_TIMEOUT = (http_client.CONNECT_TIMEOUT, http_client.READ_TIMEOUT)
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
@@ -31,151 +90,867 @@ HOMEWORK_VERDICTS = {
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
-HOMEWORK_STATUS = 'Изменился статус проверки работы "{0}". {1}'
+VALIDATOR = ResponseValidator(HOMEWORK_VERDICTS)
+RENDERER = messages.Renderer(default_locale=MESSAGE_LOCALE)
 TOKENS_PROBLEM = 'Problems with tokens: {0}'
 SENT_TO_USER = 'Sent to user: {0}'
 PROBLEMS_WITH = 'Problems with {0}'
-API_GENERAL_ERROR_LOG = (
-    'Some troubles with url={url}; params={params}; ',
-    'headers={headers}; caused error {error}'
-)
-API_STATUS_CODE_ERROR_LOG = (
-    'Bad answer from API Endpoint. Some troubles with '
-    'url={url}; params={params}; headers={header}; caused status code {code}'
-)
-ERROR_IN_JSON = (
-    'Got error in JSON: {key}: {value}. ',
-    'Requested url={url}; params={params}; headers={header};'
-)
-WRONG_TYPE_OF_RESPONSE = 'Got wrong type of response: {0}'
-RESPONSE_STRUCTURE_NO_HOMEWORKS = (
-    'Got error with response structure, no homeworks'
-)
-TYPE_ERROR_IN_HOMEWORKS_JSON = 'Got {0} homeworks instead of list'
-WRONG_STATUS_IN_PARSED_HOMEWORK = 'Bad status {0} in paresd homework'
-WRONG_NAME_IN_PARSED_HOMEWORK = 'Problems with homework_name in homework {0}'
+ERROR_IN_JSON = '{key}: {value}'
 MESSAGE_FOR_LAST_EXCEPTION = 'Got error while running: {0}'
+REPLAY_DONE_LOG = (
+    'Replayed {records} responses in {elapsed:.2f} s: '
+    '{messages} messages, {errors} errors'
+)
+DRAIN_TIMEOUT_LOG = 'Outbound queue not drained in {0} s, {1} lines left'
+CONFIG_RELOADED_LOG = 'Reloaded {0}: {1} tenants added, {2} removed'
+CONFIG_REJECTED_LOG = 'Kept previous tenants, {0} is broken: {1}'
+CYCLE_STOPPED_LOG = 'Stopped mid-cycle, skipped {0} of {1} tenants'
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-handler = RotatingFileHandler(
-    __file__ + '.log',
-    maxBytes=50000000,
-    backupCount=5
-)
-formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger.setLevel(LOG_LEVEL)
 
 
-class APIEndpointError(Exception):
-    """Bad answer from API Endpoint."""
+session = http_client.LazySession(pool_size=HTTP_POOL_SIZE)
+RECORDER = replay.Recorder(RECORD_FILE) if RECORD_FILE else None
+
+CALL_SECONDS = 'homework_call_seconds'
+CALL_SECONDS_HELP = 'Latency of bot pipeline calls'
+GET_API_ANSWER_SECONDS = metrics.REGISTRY.histogram(
+    CALL_SECONDS, CALL_SECONDS_HELP, function='get_api_answer'
+)
+CHECK_RESPONSE_SECONDS = metrics.REGISTRY.histogram(
+    CALL_SECONDS, CALL_SECONDS_HELP, function='check_response'
+)
+PARSE_STATUS_SECONDS = metrics.REGISTRY.histogram(
+    CALL_SECONDS, CALL_SECONDS_HELP, function='parse_status'
+)
+SEND_MESSAGE_SECONDS = metrics.REGISTRY.histogram(
+    CALL_SECONDS, CALL_SECONDS_HELP, function='send_message'
+)
+ERRORS_TOTAL = 'homework_errors_total'
+ERRORS_TOTAL_HELP = 'Poll cycle errors by exception class'
+ERRORS = {
+    name: metrics.REGISTRY.counter(ERRORS_TOTAL, ERRORS_TOTAL_HELP, error=name)
+    for name in (
+        'APIConnectionError', 'APIEndpointError', 'APIRateLimited',
+        'APIResponseError', 'ValueError', 'KeyError', 'TypeError'
+    )
+}
+UNCHANGED_RESPONSES = metrics.REGISTRY.counter(
+    'homework_unchanged_responses_total',
+    'API responses skipped as unchanged since the last processed one'
+)
+API_ERROR_STATUS_TOTAL = 'homework_api_error_status_total'
+API_ERROR_STATUS_TOTAL_HELP = 'Failed Practicum API calls by HTTP status'
+POLL_LAG = metrics.REGISTRY.gauge(
+    'homework_poll_lag_seconds',
+    'How late the most overdue poll of the last cycle started'
+)
 
 
 def check_tokens():
     """Проверяет доступность переменных окружения."""
-    problems = [name for name in TOKENS_NAMES if not globals()[name]]
+    names = TOKENS_NAMES
+    if TENANTS_FILE:
+        names = [
+            name for name in TOKENS_NAMES
+            if name not in SINGLE_TENANT_TOKENS_NAMES
+        ]
+    problems = [name for name in names if not globals()[name]]
     if problems:
         text = TOKENS_PROBLEM.format(problems)
         logger.critical(text)
         raise NameError(text)
 
 
+def message_options(tenant):
+    """Возвращает язык и разметку уведомлений студента."""
+    if tenant is None:
+        return MESSAGE_LOCALE, MESSAGE_MARKUP
+    return tenant.locale or MESSAGE_LOCALE, tenant.markup or MESSAGE_MARKUP
+
+
 def send_message(bot, message):
     """Отправляет сообщение в Telegram."""
+    tenant = CURRENT_TENANT.get()
+    chat_id = TELEGRAM_CHAT_ID if tenant is None else tenant.chat_id
+    parse_mode = messages.PARSE_MODES[message_options(tenant)[1]]
+    options = {} if parse_mode is None else {'parse_mode': parse_mode}
     try:
-        message = bot.send_message(TELEGRAM_CHAT_ID, message)
+        message = bot.send_message(chat_id, message, **options)
         logger.debug(SENT_TO_USER.format(message))
         return message
+    except telegram.error.RetryAfter:
+        raise
     except Exception:
         logger.exception(PROBLEMS_WITH.format(message))
         return ''
 
 
-def get_api_answer(timestamp):
-    """Делает запрос к эндпоинту API."""
+def request_api(timestamp, stream=False, conditions=None):
+    """Делает запрос к эндпоинту API и проверяет код ответа.
+
+    С заголовками условного запроса conditions допустим и ответ 304.
+    Возвращает ответ и параметры запроса для сообщений об ошибках.
+    """
+    tenant = CURRENT_TENANT.get()
     params = dict(
         url=ENDPOINT,
         params={'from_date': timestamp},
-        headers=HEADERS
+        headers=HEADERS if tenant is None else tenant.headers
     )
+    if conditions:
+        params['headers'] = {**params['headers'], **conditions}
+    started = time.perf_counter()
     try:
-        api_answer = requests.get(**params)
+        api_answer = session.get(**params, timeout=HTTP_TIMEOUT, stream=stream)
     except requests.RequestException as error:
-        raise ConnectionError(
-            API_GENERAL_ERROR_LOG.format(
-                **params,
-                error=error
-            )
+        raise APIConnectionError(
+            **params, latency=time.perf_counter() - started, detail=error
         )
-    if api_answer.status_code != 200:
-        raise APIEndpointError(
-            API_STATUS_CODE_ERROR_LOG.format(
+    status = api_answer.status_code
+    if status == 200 or conditions and status == NOT_MODIFIED:
+        return api_answer, params
+    retry_after = None
+    if status in RETRY_AFTER_STATUSES:
+        retry_after = parse_retry_after(api_answer.headers.get('Retry-After'))
+    error = APIRateLimited if status == TOO_MANY_REQUESTS else APIEndpointError
+    raise error(
+        **params,
+        status=status,
+        latency=time.perf_counter() - started,
+        retry_after=retry_after
+    )
+
+
+def check_api_error(json, params):
+    """Проверяет, что API не вернул ошибку в теле ответа."""
+    for key in ['error', 'code']:
+        if key in json:
+            raise APIResponseError(
                 **params,
-                code=api_answer.status_code
+                status=200,
+                detail=ERROR_IN_JSON.format(key=key, value=json[key])
             )
+
+
+def record_answer(timestamp, json, started):
+    """Записывает сырой ответ API, если задан RECORD_FILE."""
+    if RECORDER is not None:
+        tenant = CURRENT_TENANT.get()
+        RECORDER.record(
+            None if tenant is None else tenant.name, timestamp, json,
+            time.perf_counter() - started
         )
+
+
+def get_api_answer(timestamp):
+    """Делает запрос к эндпоинту API."""
+    started = time.perf_counter()
+    api_answer, params = request_api(timestamp)
     json = api_answer.json()
-    for key in ['error', 'code']:
-        if key in json:
-            raise ValueError(
-                ERROR_IN_JSON.format(
-                    key=key,
-                    value=json[key],
-                    **params,
-                )
-            )
+    record_answer(timestamp, json, started)
+    check_api_error(json, params)
     return json
 
 
+def get_api_answer_if_changed(timestamp, cache):
+    """Делает условный запрос к эндпоинту API.
+
+    Возвращает ответ и его валидаторы или пару None, если ответ
+    не изменился с последнего обработанного.
+    """
+    name = CURRENT_TENANT.get().name
+    started = time.perf_counter()
+    api_answer, params = request_api(
+        timestamp, conditions=cache.headers(name)
+    )
+    if api_answer.status_code == NOT_MODIFIED:
+        return None, None
+    response_validators = conditional.validators(api_answer)
+    if cache.unchanged(name, response_validators):
+        return None, None
+    json = api_answer.json()
+    record_answer(timestamp, json, started)
+    check_api_error(json, params)
+    return json, response_validators
+
+
+def read_api_changes(timestamp, statuses):
+    """Читает ответ API по частям и оставляет только изменившиеся работы.
+
+    Тело ответа не загружается целиком: каждая работа проверяется
+    и отбрасывается, если её статус совпадает с индексом statuses.
+    Возвращает записи Homework и остальные поля ответа.
+    """
+    api_answer, params = request_api(timestamp, stream=True)
+    with api_answer:
+        stream = StreamedResponse(api_answer.iter_content(CHUNK_SIZE))
+        homeworks = [
+            homework for homework in map(VALIDATOR.homework, stream)
+            if statuses.get(homework.key) != homework.status
+        ]
+    check_api_error(stream.meta, params)
+    return homeworks, stream.meta
+
+
 def check_response(response):
-    """Проверяет ответ API на соответствие документации."""
-    def test_instance(var, typ, message):
-        type_var = type(var)
-        if not (isinstance(type_var, typ) or issubclass(type_var, typ)):
-            raise TypeError(message.format(type_var))
-    test_instance(response, dict, WRONG_TYPE_OF_RESPONSE)
-    if 'homeworks' not in response:
-        raise KeyError(RESPONSE_STRUCTURE_NO_HOMEWORKS)
-    test_instance(response['homeworks'], list, TYPE_ERROR_IN_HOMEWORKS_JSON)
+    """Проверяет ответ API на соответствие документации.
+
+    Возвращает записи Homework для всех работ из ответа.
+    """
+    return VALIDATOR.response(response)
 
 
 def parse_status(homework):
     """Извлекает работе статус домашней работы."""
-    status = homework['status']
-    if status not in HOMEWORK_VERDICTS:
-        raise ValueError(
-            WRONG_STATUS_IN_PARSED_HOMEWORK.format(status)
+    if not isinstance(homework, Homework):
+        homework = VALIDATOR.homework(homework)
+    return RENDERER.status(
+        homework.name, homework.status,
+        *message_options(CURRENT_TENANT.get())
+    )
+
+
+def find_changes(homeworks, statuses):
+    """Отбирает работы, статус которых отличается от последнего в индексе.
+
+    Ответ API идёт от новых работ к старым, поэтому изменения
+    возвращаются в обратном порядке — от старых к новым.
+    """
+    seen = set()
+    changes = []
+    for homework in homeworks:
+        if homework.key in seen:
+            continue
+        seen.add(homework.key)
+        if statuses.get(homework.key) != homework.status:
+            changes.append(homework)
+    changes.reverse()
+    return changes
+
+
+def run_blocking(func, *args):
+    """Выполняет блокирующую функцию в пуле потоков цикла событий."""
+    return asyncio.get_running_loop().run_in_executor(
+        None, copy_context().run, func, *args
+    )
+
+
+async def get_api_answer_async(timestamp):
+    """Делает запрос к эндпоинту API, не блокируя цикл событий."""
+    started = time.perf_counter()
+    try:
+        return await run_blocking(get_api_answer, timestamp)
+    finally:
+        GET_API_ANSWER_SECONDS.observe(time.perf_counter() - started)
+
+
+async def get_api_answer_if_changed_async(timestamp, cache):
+    """Делает условный запрос к эндпоинту API, не блокируя цикл событий."""
+    started = time.perf_counter()
+    try:
+        return await run_blocking(get_api_answer_if_changed, timestamp, cache)
+    finally:
+        GET_API_ANSWER_SECONDS.observe(time.perf_counter() - started)
+
+
+async def read_api_changes_async(timestamp, statuses):
+    """Читает ответ API по частям, не блокируя цикл событий."""
+    started = time.perf_counter()
+    try:
+        return await run_blocking(read_api_changes, timestamp, statuses)
+    finally:
+        GET_API_ANSWER_SECONDS.observe(time.perf_counter() - started)
+
+
+async def send_message_async(bot, message):
+    """Отправляет сообщение в Telegram, не блокируя цикл событий."""
+    started = time.perf_counter()
+    try:
+        return await run_blocking(send_message, bot, message)
+    finally:
+        SEND_MESSAGE_SECONDS.observe(time.perf_counter() - started)
+
+
+def count_error(error):
+    """Увеличивает счётчик ошибок класса error."""
+    name = type(error).__name__
+    counter = ERRORS.get(name)
+    if counter is None:
+        counter = ERRORS[name] = metrics.REGISTRY.counter(
+            ERRORS_TOTAL, ERRORS_TOTAL_HELP, error=name
+        )
+    counter.inc()
+    if isinstance(error, APIError) and error.status is not None:
+        metrics.REGISTRY.counter(
+            API_ERROR_STATUS_TOTAL, API_ERROR_STATUS_TOTAL_HELP,
+            status=error.status
+        ).inc()
+
+
+async def deliver(bot, tenant, message):
+    """Отправляет сообщение из очереди в чат студента."""
+    CURRENT_TENANT.set(tenant)
+    return await send_message_async(bot, message)
+
+
+async def notify_changes(tenant, homeworks, queue, history=None):
+    """Ставит в очередь по сообщению на каждую смену статуса работы.
+
+    Принимает записи Homework из check_response. Доставленные
+    изменения попадают в history вместе с номером сообщения Telegram,
+    если она передана.
+
+    Возвращает признаки доставки каждого сообщения.
+    """
+    changes = find_changes(homeworks, tenant.statuses)
+    messages = []
+    for homework in changes:
+        started = time.perf_counter()
+        messages.append(parse_status(homework))
+        PARSE_STATUS_SECONDS.observe(time.perf_counter() - started)
+    delivered = await asyncio.gather(*(
+        queue.put(tenant, message) for message in messages
+    ))
+    for homework, result in zip(changes, delivered):
+        if result:
+            tenant.statuses[homework.key] = homework.status
+            tenant.names[homework.key] = homework.name
+            if history is not None:
+                history.record(
+                    tenant.name, homework,
+                    message_id=getattr(result, 'message_id', None)
+                )
+    return delivered
+
+
+def is_outage(error):
+    """Отличает недоступность API от ошибок отдельного студента.
+
+    Отказ — это сбой соединения или ответ 5xx. Ответы 4xx, включая
+    401, 403 и 429, относятся к токену студента и цепь не размыкают.
+    """
+    if isinstance(error, APIEndpointError):
+        return (
+            not isinstance(error, APIRateLimited)
+            and error.status is not None and error.status >= 500
         )
-    if 'homework_name' not in homework:
-        raise KeyError(WRONG_NAME_IN_PARSED_HOMEWORK.format(homework))
-    return HOMEWORK_STATUS.format(
-        homework['homework_name'],
-        HOMEWORK_VERDICTS[status]
+    return isinstance(error, ConnectionError)
+
+
+class PollingEngine:
+    """Общий цикл событий для одновременных циклов опроса."""
+
+    def __init__(self, bot, store=None, scheduler=None,
+                 concurrency=POLL_CONCURRENCY, streaming=STREAM_RESPONSES,
+                 conditional_requests=CONDITIONAL_REQUESTS, commands=COMMANDS,
+                 health=None, history=None):
+        """Создаёт цикл событий с пулом потоков для блокирующих вызовов."""
+        self.bot = bot
+        self.streaming = streaming
+        self.responses = (
+            conditional.ResponseCache() if conditional_requests else None
+        )
+        self.queue = DeliveryQueue(partial(deliver, bot))
+        self.store = state.MemoryStateStore() if store is None else store
+        self.scheduler = Scheduler(
+            base_period=RETRY_PERIOD,
+            backoff_errors=(ConnectionError, APIEndpointError, CircuitOpen)
+        ) if scheduler is None else scheduler
+        self.breaker = CircuitBreaker(counts=is_outage)
+        self.errors = ErrorDigest()
+        self.history = journal.open_history() if history is None else history
+        self.health = health
+        self.stopping = False
+        self._serving = None
+        self.commands = CommandHandler(
+            bot, self.scheduler, self.queue, self.history, RENDERER,
+            message_options
+        ) if commands else None
+        self.concurrency = concurrency
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(ThreadPoolExecutor(concurrency))
+
+    async def request(self, tenant):
+        """Запрашивает API, если размыкатель это разрешает."""
+        self.breaker.check(time.monotonic())
+        try:
+            if self.streaming:
+                result = await read_api_changes_async(
+                    tenant.timestamp, tenant.statuses
+                )
+            elif self.responses is not None:
+                result = await get_api_answer_if_changed_async(
+                    tenant.timestamp, self.responses
+                )
+            else:
+                result = await get_api_answer_async(tenant.timestamp)
+        except BaseException as error:
+            self.breaker.record(time.monotonic(), error)
+            raise
+        self.breaker.record(time.monotonic())
+        return result
+
+    async def fetch(self, tenant):
+        """Возвращает записи работ студента, поля ответа API и валидаторы.
+
+        Для ответа, не изменившегося с последнего обработанного,
+        список работ пуст, а курсор студента не сдвигается.
+        """
+        if self.streaming:
+            homeworks, response = await self.request(tenant)
+            return homeworks, response, None
+        response_validators = None
+        if self.responses is None:
+            response = await self.request(tenant)
+        else:
+            response, response_validators = await self.request(tenant)
+            if response is None:
+                UNCHANGED_RESPONSES.inc()
+                return [], {}, None
+        logger.debug(response)
+        started = time.perf_counter()
+        homeworks = check_response(response)
+        CHECK_RESPONSE_SECONDS.observe(time.perf_counter() - started)
+        return homeworks, response, response_validators
+
+    async def report_error(self, tenant, error):
+        """Логирует ошибку цикла и сообщает о ней без повторов."""
+        count_error(error)
+        message = MESSAGE_FOR_LAST_EXCEPTION.format(error)
+        if isinstance(error, CircuitOpen):
+            logger.debug(message)
+            return
+        logger.exception(message)
+        text = self.errors.report(
+            tenant.name, error,
+            RENDERER.error(error, *message_options(tenant)),
+            time.monotonic(),
+            RENDERER.catalog(*message_options(tenant)).repeated_error
+        )
+        if text:
+            await self.queue.put(tenant, text)
+
+    async def poll(self, tenant):
+        """Выполняет один цикл опроса API и отправки статусов студенту.
+
+        Курсор сдвигается и ответ запоминается как обработанный, только
+        когда все изменения доставлены.
+        Возвращает пару: были ли доставлены изменения и ошибка цикла.
+        """
+        CURRENT_TENANT.set(tenant)
+        try:
+            homeworks, response, response_validators = await self.fetch(
+                tenant
+            )
+            delivered = await notify_changes(
+                tenant, homeworks, self.queue, self.history
+            )
+        except Exception as error:
+            await self.report_error(tenant, error)
+            return False, error
+        if all(delivered):
+            tenant.timestamp = response.get('current_date', tenant.timestamp)
+            if response_validators is not None:
+                self.responses.remember(tenant.name, response_validators)
+        self.store.save(tenant)
+        digest = self.errors.resolve(
+            tenant.name,
+            RENDERER.catalog(*message_options(tenant)).error_cleared
+        )
+        if digest:
+            await self.queue.put(tenant, digest)
+        return any(delivered), None
+
+    async def poll_all(self, tenants):
+        """Опрашивает студентов, не более concurrency одновременно."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded_poll(tenant):
+            async with semaphore:
+                if self.stopping:
+                    return False, None
+                return await self.poll(tenant)
+
+        return await asyncio.gather(
+            *(bounded_poll(tenant) for tenant in tenants)
+        )
+
+    def run_cycle(self, tenants):
+        """Опрашивает студентов, которым подошла очередь.
+
+        Возвращает число секунд до следующего опроса.
+        """
+        now = time.monotonic()
+        self.scheduler.sync(tenants, now)
+        due = self.scheduler.due(now)
+        POLL_LAG.set(self.scheduler.lag)
+        results = self.loop.run_until_complete(self.poll_all(due))
+        now = time.monotonic()
+        for tenant, (changed, error) in zip(due, results):
+            self.scheduler.reschedule(tenant, now, changed, error)
+        self.store.flush_if_due()
+        self.history.flush_if_due()
+        delay = self.scheduler.delay(now)
+        if self.health is not None:
+            self.health.report(
+                len(due), sum(error is not None for _, error in results), delay
+            )
+        return delay
+
+    def answer_commands(self, tenants, delay):
+        """Отвечает на команды студентов до следующего опроса.
+
+        Команды обрабатываются в том же цикле событий, что и опрос.
+        Возвращает, сколько ещё секунд ждать до опроса.
+        """
+        if self.commands is None or self.stopping:
+            return delay
+        self._serving = self.loop.create_task(
+            self.commands.serve(tenants, delay)
+        )
+        try:
+            self.loop.run_until_complete(self._serving)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._serving = None
+        return 0
+
+    def stop(self):
+        """Перестаёт начинать новые опросы и принимать команды.
+
+        Можно вызывать из обработчика сигнала.
+        """
+        self.stopping = True
+        if self._serving is not None:
+            self.loop.call_soon_threadsafe(self._serving.cancel)
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Дожидается отправки очереди не дольше timeout секунд и закрывается.
+
+        Состояние студентов сохраняется в любом случае.
+        """
+        self.stopping = True
+        try:
+            self.loop.run_until_complete(
+                asyncio.wait_for(self.queue.join(), timeout)
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                DRAIN_TIMEOUT_LOG.format(timeout, self.queue.pending())
+            )
+        finally:
+            self.close()
+
+    def close(self):
+        """Сохраняет состояние и историю и закрывает цикл событий."""
+        self.store.close()
+        self.history.close()
+        self.loop.run_until_complete(self.loop.shutdown_default_executor())
+        self.loop.close()
+
+
+class ThreadedPoller:
+    """Опрос студентов в пуле потоков для развёртываний без asyncio.
+
+    get_api_answer, check_response и parse_status выполняются в
+    потоках FanOutRunner, а сообщения отправляются вызывающим потоком
+    в порядке готовности результатов. Интерфейс тот же, что у
+    PollingEngine, опрос идёт раз в RETRY_PERIOD.
+    """
+
+    def __init__(self, bot, store=None, workers=POLL_CONCURRENCY,
+                 timeout=POLL_TASK_TIMEOUT, history=None, health=None,
+                 max_retries=MAX_RETRIES):
+        """Создаёт пул на workers потоков с тайм-аутом опроса timeout."""
+        self.bot = bot
+        self.max_retries = max_retries
+        self.health = health
+        self.store = state.MemoryStateStore() if store is None else store
+        self.history = journal.open_history() if history is None else history
+        self.runner = fanout.FanOutRunner(self.fetch, workers, timeout)
+        self.errors = ErrorDigest()
+        self.stopping = False
+
+    @staticmethod
+    def fetch(tenant):
+        """Запрашивает и разбирает ответ API для студента в потоке пула.
+
+        Возвращает ответ и пары (работа, сообщение) для изменений.
+        """
+        CURRENT_TENANT.set(tenant)
+        return ThreadedPoller.parse(tenant, get_api_answer(tenant.timestamp))
+
+    @staticmethod
+    def parse(tenant, response):
+        """Разбирает ответ API и готовит сообщения об изменениях.
+
+        Возвращает ответ и пары (работа, сообщение) для изменений.
+        """
+        homeworks = check_response(response)
+        return response, [
+            (homework, parse_status(homework))
+            for homework in find_changes(homeworks, tenant.statuses)
+        ]
+
+    def send(self, tenant, text):
+        """Отправляет сообщение студенту из вызывающего потока.
+
+        На ответ RetryAfter ждёт указанное время и повторяет не больше
+        max_retries раз, после чего считает сообщение недоставленным.
+        """
+        token = CURRENT_TENANT.set(tenant)
+        try:
+            for _ in range(self.max_retries + 1):
+                try:
+                    return send_message(self.bot, text)
+                except telegram.error.RetryAfter as error:
+                    logger.warning(RETRY_AFTER_LOG.format(
+                        tenant.chat_id, error.retry_after
+                    ))
+                    time.sleep(error.retry_after)
+            return ''
+        finally:
+            CURRENT_TENANT.reset(token)
+
+    def report_error(self, tenant, error):
+        """Логирует ошибку опроса и сообщает о ней без повторов."""
+        count_error(error)
+        message = MESSAGE_FOR_LAST_EXCEPTION.format(error)
+        logger.error(message, exc_info=error)
+        text = self.errors.report(
+            tenant.name, error,
+            RENDERER.error(error, *message_options(tenant)),
+            time.monotonic(),
+            RENDERER.catalog(*message_options(tenant)).repeated_error
+        )
+        if text:
+            self.send(tenant, text)
+
+    def deliver(self, tenant, response, changes):
+        """Отправляет изменения и сдвигает курсор, если всё доставлено."""
+        for homework, message in changes:
+            result = self.send(tenant, message)
+            if not result:
+                break
+            tenant.statuses[homework.key] = homework.status
+            tenant.names[homework.key] = homework.name
+            self.history.record(
+                tenant.name, homework,
+                message_id=getattr(result, 'message_id', None)
+            )
+        else:
+            tenant.timestamp = response.get('current_date', tenant.timestamp)
+        self.store.save(tenant)
+        digest = self.errors.resolve(
+            tenant.name,
+            RENDERER.catalog(*message_options(tenant)).error_cleared
+        )
+        if digest:
+            self.send(tenant, digest)
+
+    def run_cycle(self, tenants):
+        """Опрашивает всех студентов и возвращает паузу до следующего цикла.
+
+        После stop ещё не начатые отправки пропускаются, а невзятые
+        опросы отменяются.
+        """
+        tenants = list(tenants)
+        polled = errors = 0
+        results = self.runner.run(tenants)
+        try:
+            for tenant, result, error in results:
+                if self.stopping:
+                    logger.info(CYCLE_STOPPED_LOG.format(
+                        len(tenants) - polled, len(tenants)
+                    ))
+                    break
+                polled += 1
+                if error is not None:
+                    errors += 1
+                    self.report_error(tenant, error)
+                else:
+                    self.deliver(tenant, *result)
+        finally:
+            results.close()
+        self.store.flush_if_due()
+        self.history.flush_if_due()
+        if self.health is not None:
+            self.health.report(polled, errors, RETRY_PERIOD)
+        return RETRY_PERIOD
+
+    def answer_commands(self, tenants, delay):
+        """Команды в этом режиме не принимаются."""
+        return delay
+
+    def stop(self):
+        """Прерывает текущий цикл опроса после начатой отправки.
+
+        Можно вызывать из обработчика сигнала.
+        """
+        self.stopping = True
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Ждёт начатые опросы не дольше timeout секунд и закрывается.
+
+        Состояние студентов и история сохраняются в любом случае.
+        """
+        self.stopping = True
+        self.runner.close(timeout)
+        self.store.close()
+        self.history.close()
+
+
+class ReplayEngine(ThreadedPoller):
+    """Прогоняет записанные ответы API через разбор и отправку.
+
+    Сеть не нужна: ответы берутся из записи RECORD_FILE, а дальше
+    идут тем же путём, что у ThreadedPoller, — check_response,
+    поиск изменений, parse_status и отправка. Студенты, которых нет
+    в переданном списке, заводятся по именам из записи.
+    """
+
+    def __init__(self, bot, records, speed=REPLAY_SPEED, store=None,
+                 history=None):
+        """Принимает записи и скорость воспроизведения, 0 — без пауз."""
+        super().__init__(bot, store, workers=1, history=history)
+        self.player = replay.Player(records, speed)
+
+    def replay(self, tenants=()):
+        """Воспроизводит записи и возвращает статистику прогона."""
+        tenants = {tenant.name: tenant for tenant in tenants}
+        started = time.perf_counter()
+        stats = {'records': 0, 'errors': 0}
+        for record in self.player:
+            tenant = tenants.get(record.tenant)
+            if tenant is None:
+                tenant = tenants[record.tenant] = Tenant(
+                    '', record.tenant, name=record.tenant,
+                    timestamp=record.from_date
+                )
+            stats['records'] += 1
+            token = CURRENT_TENANT.set(tenant)
+            try:
+                check_api_error(record.response, dict(
+                    url=ENDPOINT, params={'from_date': record.from_date}
+                ))
+                result = self.parse(tenant, record.response)
+            except Exception as error:
+                stats['errors'] += 1
+                self.report_error(tenant, error)
+            else:
+                self.deliver(tenant, *result)
+            finally:
+                CURRENT_TENANT.reset(token)
+        self.store.flush()
+        stats['elapsed'] = time.perf_counter() - started
+        return stats
+
+
+def dry_run(path, speed=REPLAY_SPEED):
+    """Воспроизводит запись REPLAY_FILE без токенов и сети.
+
+    Сообщения не отправляются в Telegram, а пишутся в лог.
+    """
+    with logs.queued(
+        logging.getLogger(), LOG_FILE, LOG_JSON, LOG_LEVEL
+    ):
+        bot = replay.DryRunBot()
+        engine = ReplayEngine(
+            bot, replay.read_records(path), speed,
+            history=journal.open_history(
+                HISTORY_PATH, retention=HISTORY_RETENTION
+            )
+        )
+        try:
+            tenants = load_tenants() if TENANTS_FILE else ()
+            stats = engine.replay(tenants)
+        finally:
+            engine.shutdown()
+        logger.info(REPLAY_DONE_LOG.format(messages=len(bot.sent), **stats))
+        return stats
+
+
+def open_engine(bot, store, history=None):
+    """Создаёт движок опроса, выбранный в POLL_RUNNER."""
+    health = sharding.open_reporter(WORKER_NAME, HEALTH_FD)
+    if POLL_RUNNER == 'threads':
+        return ThreadedPoller(bot, store, history=history, health=health)
+    return PollingEngine(bot, store, health=health, history=history)
+
+
+def load_tenants():
+    """Загружает студентов из TENANTS_FILE или переменных окружения.
+
+    В процессе-шарде остаются только студенты этого шарда.
+    """
+    if TENANTS_FILE:
+        tenants = config.load_tenants(TENANTS_FILE, messages.CATALOGS)
+    else:
+        tenants = [Tenant(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)]
+    if WORKER_NAME:
+        tenants = sharding.shard(tenants, WORKER_NAME, WORKERS)
+    return TenantRegistry(tenants)
+
+
+def reload_tenants(tenants, store):
+    """Перечитывает TENANTS_FILE в работающий реестр студентов.
+
+    Курсоры и статусы оставшихся студентов не теряются, новые
+    восстанавливаются из хранилища. Если файл не читается или в нём
+    есть ошибки, остаётся прежний список.
+    """
+    try:
+        fresh = load_tenants()
+    except (OSError, ValueError) as error:
+        logger.error(CONFIG_REJECTED_LOG.format(TENANTS_FILE, error))
+        return
+    added, removed = tenants.sync(fresh)
+    store.restore(added)
+    logger.info(
+        CONFIG_RELOADED_LOG.format(TENANTS_FILE, len(added), len(removed))
     )
 
 
 def main():
     """Основная логика работы бота."""
-    check_tokens()
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    sent_message = ''
-    while True:
+    with logs.queued(
+        logging.getLogger(), LOG_FILE, LOG_JSON, LOG_LEVEL
+    ):
+        check_tokens()
+        bot = telegram.Bot(token=TELEGRAM_TOKEN)
+        if METRICS_PORT:
+            metrics.serve(METRICS_PORT)
+        store = state.open_store(STATE_BACKEND, STATE_PATH)
+        tenants = load_tenants()
+        store.restore(tenants)
+        engine = open_engine(bot, store, journal.open_history(
+            HISTORY_PATH, retention=HISTORY_RETENTION
+        ))
+        watcher = config.ConfigWatcher(TENANTS_FILE) if TENANTS_FILE else None
+        shutdown = ShutdownSignal(engine.stop)
+        shutdown.install()
         try:
-            response = get_api_answer(timestamp)
-            logger.debug(response)
-            check_response(response)
-            if response['homeworks']:
-                message = parse_status(response['homeworks'][0])
-                if sent_message != message:
-                    sent_message = send_message(bot, message)
-        except Exception as error:
-            message = MESSAGE_FOR_LAST_EXCEPTION.format(error)
-            logger.exception(message)
-            send_message(bot, message)
-        time.sleep(RETRY_PERIOD)
+            while not shutdown.requested:
+                if watcher is not None and watcher.changed():
+                    reload_tenants(tenants, store)
+                delay = engine.run_cycle(tenants)
+                delay = engine.answer_commands(tenants, delay)
+                with shutdown.idle():
+                    time.sleep(delay)
+        except GracefulExit:
+            pass
+        finally:
+            shutdown.uninstall()
+            engine.shutdown(SHUTDOWN_TIMEOUT)
+            if RECORDER is not None:
+                RECORDER.close()
 
 
 if __name__ == '__main__':
-    main()
+    if REPLAY_FILE:
+        dry_run(REPLAY_FILE)
+    else:
+        main()
@@ -0,0 +1,66 @@
+import threading
+
+from lazy import LazyModule
+
+requests = LazyModule('requests')
+adapters = LazyModule('requests.adapters')
+retry = LazyModule('urllib3.util.retry')
+
+
+POOL_SIZE = 10
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 30
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (502, 503, 504)
+
+
+def build_session(pool_size=POOL_SIZE, retries=RETRIES,
+                  backoff_factor=BACKOFF_FACTOR):
+    """Создаёт сессию с пулом keep-alive соединений и повторами.
+
+    Retry-After сессия не выжидает: ответ с ним возвращается сразу,
+    а паузу выдерживает планировщик опросов, не занимая поток пула.
+    """
+    adapter = adapters.HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry.Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class LazySession:
+    """Сессия build_session, которая создаётся при первом обращении.
+
+    Пока бот ничего не запрашивает, requests не импортируется.
+    """
+
+    def __init__(self, **options):
+        """Запоминает параметры будущей сессии."""
+        self._options = options
+        self._session = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Создаёт сессию, если её ещё нет, и возвращает её."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = build_session(**self._options)
+        return self._session
+
+    def __getattr__(self, name):
+        """Берёт атрибут настоящей сессии, создавая её при нужде."""
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.open(), name)
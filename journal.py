@@ -0,0 +1,166 @@
+from collections import namedtuple
+import sqlite3
+import time
+
+from commands import HISTORY_SIZE, History
+from schema import Homework
+
+
+FLUSH_INTERVAL = 30
+RETENTION = None
+COMPACT_INTERVAL = 24 * 60 * 60
+
+Notification = namedtuple(
+    'Notification',
+    ('tenant', 'key', 'name', 'status', 'sent_at', 'message_id')
+)
+
+
+class NotificationJournal:
+    """Журнал отправленных уведомлений о статусах работ в SQLite.
+
+    Записи только дописываются и сбрасываются в базу пачкой не чаще
+    раза в flush_interval секунд. Индексы по студенту и времени
+    делают быстрыми и /history, и выборки за период для аудита.
+    Раз в compact_interval освободившиеся страницы возвращаются
+    файловой системе. Записи старше retention секунд удаляются, только
+    если retention задан явно: по умолчанию журнал хранит всё.
+
+    Умеет всё то же, что commands.History, поэтому подходит
+    CommandHandler вместо неё.
+    """
+
+    def __init__(self, path, size=HISTORY_SIZE, retention=RETENTION,
+                 flush_interval=FLUSH_INTERVAL,
+                 compact_interval=COMPACT_INTERVAL):
+        """Открывает базу и создаёт таблицу с индексами."""
+        self.size = size
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self.flushed_at = self.compacted_at = time.monotonic()
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS notifications ('
+                'tenant TEXT NOT NULL, homework TEXT NOT NULL, name TEXT, '
+                'status TEXT NOT NULL, sent_at REAL NOT NULL, '
+                'message_id INTEGER)'
+            )
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS notifications_tenant_time '
+                'ON notifications (tenant, sent_at)'
+            )
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS notifications_time '
+                'ON notifications (sent_at)'
+            )
+        self._pending = []
+        self._names = {}
+
+    def record(self, name, homework, message_id=None, sent_at=None):
+        """Запоминает доставленное изменение статуса работы."""
+        self._pending.append(Notification(
+            name, homework.key, homework.name, homework.status,
+            time.time() if sent_at is None else sent_at, message_id
+        ))
+        self._names.setdefault(name, {})[homework.key] = homework.name
+
+    def flush(self):
+        """Дописывает накопленные записи в базу одной транзакцией."""
+        if self._pending:
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT INTO notifications VALUES (?, ?, ?, ?, ?, ?)',
+                    self._pending
+                )
+            self._pending = []
+        self.flushed_at = time.monotonic()
+
+    def flush_if_due(self):
+        """Сбрасывает записи и чистит журнал, когда подходит срок."""
+        now = time.monotonic()
+        if now - self.flushed_at >= self.flush_interval:
+            self.flush()
+        if now - self.compacted_at >= self.compact_interval:
+            self.compact()
+
+    def compact(self, now=None):
+        """Сжимает файл базы, удалив записи старше retention, если он задан.
+
+        Возвращает число удалённых записей.
+        """
+        self.flush()
+        removed = 0
+        if self.retention is not None:
+            now = time.time() if now is None else now
+            with self.connection:
+                removed = self.connection.execute(
+                    'DELETE FROM notifications WHERE sent_at < ?',
+                    (now - self.retention,)
+                ).rowcount
+        self.connection.execute('PRAGMA incremental_vacuum')
+        self.compacted_at = time.monotonic()
+        return removed
+
+    def query(self, tenant=None, since=None, until=None, limit=None):
+        """Возвращает уведомления за период от старых к новым.
+
+        tenant ограничивает выборку одним студентом, since и until —
+        время отправки в секундах эпохи, включительно.
+        """
+        self.flush()
+        conditions, values = [], []
+        for condition, value in (
+            ('tenant = ?', tenant),
+            ('sent_at >= ?', since),
+            ('sent_at <= ?', until),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                values.append(value)
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        rows = self.connection.execute(
+            'SELECT * FROM notifications' + where
+            + ' ORDER BY sent_at LIMIT ?',
+            (*values, -1 if limit is None else limit)
+        )
+        return [Notification(*row) for row in rows]
+
+    def get(self, name):
+        """Возвращает последние size изменений студента от старых к новым."""
+        self.flush()
+        rows = self.connection.execute(
+            'SELECT homework, name, status FROM notifications '
+            'WHERE tenant = ? ORDER BY sent_at DESC LIMIT ?',
+            (name, self.size)
+        ).fetchall()
+        return [Homework(*row) for row in reversed(rows)]
+
+    def homework_name(self, name, key):
+        """Возвращает название работы или её ключ, если название неизвестно."""
+        names = self._names.setdefault(name, {})
+        if key not in names:
+            self.flush()
+            row = self.connection.execute(
+                'SELECT name FROM notifications WHERE tenant = ? '
+                'AND homework = ? ORDER BY sent_at DESC LIMIT 1',
+                (name, key)
+            ).fetchone()
+            if row is None:
+                return key
+            names[key] = row[0]
+        return names[key]
+
+    def close(self):
+        """Сбрасывает оставшиеся записи и закрывает базу."""
+        self.flush()
+        self.connection.close()
+
+
+def open_history(path=None, size=HISTORY_SIZE, retention=RETENTION):
+    """Открывает журнал в SQLite по path или историю в памяти без него."""
+    if path is None:
+        return History(size)
+    return NotificationJournal(path, size, retention)
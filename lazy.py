@@ -0,0 +1,38 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """Модуль, который импортируется при первом обращении к атрибуту.
+
+    Тяжёлые зависимости вроде telegram и requests не нужны, пока бот
+    ничего не отправляет, поэтому импорт модуля бота их не грузит.
+    Сам модуль кешируется, а атрибуты каждый раз берутся из него,
+    так что подмены вроде monkeypatch.setattr(telegram, 'Bot', ...)
+    видны и через обёртку.
+    """
+
+    def __init__(self, name):
+        """Запоминает полное имя модуля, например 'telegram.error'."""
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Импортирует модуль, если это ещё не сделано, и возвращает его."""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, name):
+        """Берёт атрибут настоящего модуля, импортируя его при нужде."""
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        """Показывает имя модуля и загружен ли он."""
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
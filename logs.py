@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import queue
+
+
+MAX_BYTES = 50000000
+BACKUP_COUNT = 5
+TEXT_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Кладёт запись в очередь как есть.
+
+    Стандартный QueueHandler форматирует запись в потоке, который её
+    создал. Здесь сообщение собирается уже в фоновом потоке слушателя,
+    поэтому repr больших аргументов не тормозит цикл опроса.
+    """
+
+    def prepare(self, record):
+        """Возвращает запись без форматирования."""
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись как одну строку JSON."""
+
+    def format(self, record):
+        """Возвращает JSON с временем, уровнем, логгером и сообщением."""
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+@contextmanager
+def queued(logger, path, json_lines=False, level=None, max_bytes=MAX_BYTES,
+           backup_count=BACKUP_COUNT):
+    """Пишет логгер в файл через очередь и фоновый поток.
+
+    level, если задан, ставится логгеру на время контекста: для
+    корневого логгера он действует на все модули без своего уровня.
+    При выходе из контекста оставшиеся записи дописываются в файл.
+    """
+    handler = RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count
+    )
+    handler.setFormatter(
+        JsonFormatter() if json_lines else logging.Formatter(TEXT_FORMAT)
+    )
+    records = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(records)
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    previous_level = logger.level
+    if level is not None:
+        logger.setLevel(level)
+    listener.start()
+    logger.addHandler(queue_handler)
+    try:
+        yield listener
+    finally:
+        logger.removeHandler(queue_handler)
+        logger.setLevel(previous_level)
+        listener.stop()
+        handler.close()
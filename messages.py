@@ -0,0 +1,156 @@
+from collections import namedtuple
+from functools import lru_cache, partial
+import html
+import re
+
+
+PLAIN = 'plain'
+MARKDOWN = 'markdown'
+HTML = 'html'
+PARSE_MODES = {PLAIN: None, MARKDOWN: 'Markdown', HTML: 'HTML'}
+DEFAULT_LOCALE = 'ru'
+CACHE_SIZE = 4096
+UNKNOWN_MARKUP = 'Unknown markup {0}, expected one of {1}'
+
+MARKDOWN_SPECIAL = re.compile(r'([_*`\[])')
+ESCAPES = {
+    PLAIN: str,
+    MARKDOWN: partial(MARKDOWN_SPECIAL.sub, r'\\\1'),
+    HTML: partial(html.escape, quote=False),
+}
+
+Catalog = namedtuple('Catalog', (
+    'homework_status', 'error', 'verdicts',
+    'no_statuses', 'no_history', 'paused', 'already_paused',
+    'resumed', 'not_paused', 'help', 'repeated_error', 'error_cleared',
+))
+
+CATALOGS = {
+    'ru': Catalog(
+        homework_status='Изменился статус проверки работы "{name}". {verdict}',
+        error='Got error while running: {error}',
+        verdicts={
+            'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
+            'reviewing': 'Работа взята на проверку ревьюером.',
+            'rejected': 'Работа проверена: у ревьюера есть замечания.',
+        },
+        no_statuses='Пока нет данных о ваших работах.',
+        no_history='Статусы работ ещё не менялись.',
+        paused='Опрос приостановлен. Чтобы продолжить, отправьте /resume.',
+        already_paused='Опрос уже приостановлен.',
+        resumed='Опрос возобновлён.',
+        not_paused='Опрос и так идёт.',
+        help='Команды: /status, /history, /pause, /resume.',
+        repeated_error='Ошибка повторилась ещё {count} раз: {message}',
+        error_cleared='Ошибка прошла после {count} повторов: {message}',
+    ),
+    'en': Catalog(
+        homework_status='Review status of "{name}" changed. {verdict}',
+        error='Got error while running: {error}',
+        verdicts={
+            'approved': 'The reviewer accepted the work. Hooray!',
+            'reviewing': 'The work is being reviewed.',
+            'rejected': 'The reviewer left some remarks.',
+        },
+        no_statuses='No data about your homework yet.',
+        no_history='Homework statuses have not changed yet.',
+        paused='Polling paused. Send /resume to continue.',
+        already_paused='Polling is already paused.',
+        resumed='Polling resumed.',
+        not_paused='Polling is already running.',
+        help='Commands: /status, /history, /pause, /resume.',
+        repeated_error='Error repeated {count} more times: {message}',
+        error_cleared='Error cleared after {count} repeats: {message}',
+    ),
+}
+
+
+def escape(text, markup=PLAIN):
+    """Экранирует текст для разметки сообщения Telegram."""
+    try:
+        return ESCAPES[markup](text)
+    except KeyError:
+        raise ValueError(UNKNOWN_MARKUP.format(markup, tuple(PARSE_MODES)))
+
+
+def emphasize_markdown(name):
+    """Выделяет название жирным в Markdown Telegram.
+
+    Внутри сущности Markdown экранировать нельзя, поэтому выделение
+    закрывается перед спецсимволом и открывается снова после него.
+    """
+    return ''.join(
+        ESCAPES[MARKDOWN](part) if MARKDOWN_SPECIAL.fullmatch(part)
+        else f'*{part}*'
+        for part in MARKDOWN_SPECIAL.split(name) if part
+    )
+
+
+EMPHASIS = {
+    PLAIN: str,
+    MARKDOWN: emphasize_markdown,
+    HTML: lambda name: f'<b>{ESCAPES[HTML](name)}</b>',
+}
+
+
+def compile_catalog(catalog, markup):
+    """Готовит каталог к разметке: экранирует постоянный текст один раз."""
+    return catalog._replace(
+        verdicts={
+            status: escape(verdict, markup)
+            for status, verdict in catalog.verdicts.items()
+        },
+        **{
+            field: escape(text, markup)
+            for field, text in catalog._asdict().items()
+            if field != 'verdicts'
+        }
+    )
+
+
+class Renderer:
+    """Собирает уведомления по каталогам шаблонов для языков.
+
+    Каталоги компилируются под разметку при первом обращении, а готовые
+    сообщения о статусах хранятся в LRU-кеше по названию работы,
+    статусу, языку и разметке.
+    """
+
+    def __init__(self, catalogs=CATALOGS, default_locale=DEFAULT_LOCALE,
+                 cache_size=CACHE_SIZE):
+        """Запоминает каталоги и создаёт кеш на cache_size сообщений."""
+        self.catalogs = catalogs
+        self.default_locale = default_locale
+        self._compiled = {}
+        self.status = lru_cache(maxsize=cache_size)(self.render_status)
+
+    def catalog(self, locale, markup):
+        """Возвращает каталог языка, подготовленный под разметку.
+
+        Для неизвестного языка берётся каталог языка по умолчанию.
+        """
+        key = (locale, markup)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            catalog = self.catalogs.get(locale)
+            if catalog is None:
+                catalog = self.catalogs[self.default_locale]
+            compiled = self._compiled[key] = compile_catalog(catalog, markup)
+        return compiled
+
+    def render_status(self, name, status, locale=DEFAULT_LOCALE,
+                      markup=PLAIN):
+        """Собирает сообщение о новом статусе работы без кеша.
+
+        Название работы выделяется средствами разметки.
+        """
+        catalog = self.catalog(locale, markup)
+        return catalog.homework_status.format(
+            name=EMPHASIS[markup](name), verdict=catalog.verdicts[status]
+        )
+
+    def error(self, error, locale=DEFAULT_LOCALE, markup=PLAIN):
+        """Собирает сообщение об ошибке цикла опроса."""
+        return self.catalog(locale, markup).error.format(
+            error=escape(str(error), markup)
+        )
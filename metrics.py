@@ -0,0 +1,153 @@
+from bisect import bisect_left
+import threading
+
+from lazy import LazyModule
+
+http_server = LazyModule('http.server')
+
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1, 2.5, 5, 10, 30,
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_PATH = '/metrics'
+WRONG_METRIC_TYPE = 'Metric {0} is already registered as {1}'
+
+
+class Counter:
+    """Счётчик, который только растёт."""
+
+    __slots__ = ('value',)
+    kind = 'counter'
+
+    def __init__(self):
+        """Создаёт нулевой счётчик."""
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Увеличивает счётчик."""
+        self.value += amount
+
+    def samples(self, name, labels):
+        """Возвращает строки счётчика в текстовом формате Prometheus."""
+        yield f'{name}{labels} {self.value}'
+
+
+class Gauge(Counter):
+    """Значение, которое может и расти, и уменьшаться."""
+
+    __slots__ = ()
+    kind = 'gauge'
+
+    def set(self, value):
+        """Задаёт текущее значение."""
+        self.value = value
+
+
+class Histogram:
+    """Гистограмма с заранее заданными границами корзин.
+
+    Наблюдение — это поиск корзины и три сложения: никаких блокировок и
+    новых объектов, кроме самих чисел.
+    """
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+    kind = 'histogram'
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        """Создаёт пустые корзины."""
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Учитывает одно наблюдение."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        """Возвращает строки гистограммы в текстовом формате Prometheus."""
+        inner = labels[1:-1] + ',' if labels else ''
+        total = 0
+        for bound, count in zip(self.bounds + ('+Inf',), self.counts):
+            total += count
+            yield f'{name}_bucket{{{inner}le="{bound}"}} {total}'
+        yield f'{name}_sum{labels} {self.sum}'
+        yield f'{name}_count{labels} {self.count}'
+
+
+def format_labels(labels):
+    """Собирает метки в виде {key="value",...}."""
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{key}="{value}"' for key, value in sorted(labels.items())
+    ) + '}'
+
+
+class Registry:
+    """Набор метрик процесса."""
+
+    def __init__(self):
+        """Создаёт пустой набор."""
+        self._families = {}
+
+    def _metric(self, cls, name, help_text, labels):
+        family = self._families.setdefault(name, (cls, help_text, {}))
+        if family[0] is not cls:
+            raise ValueError(WRONG_METRIC_TYPE.format(name, family[0].kind))
+        key = format_labels(labels)
+        metric = family[2].get(key)
+        if metric is None:
+            metric = family[2][key] = cls()
+        return metric
+
+    def counter(self, name, help_text, **labels):
+        """Возвращает счётчик с указанными метками."""
+        return self._metric(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, **labels):
+        """Возвращает измеритель с указанными метками."""
+        return self._metric(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, **labels):
+        """Возвращает гистограмму с указанными метками."""
+        return self._metric(Histogram, name, help_text, labels)
+
+    def render(self):
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        lines = []
+        for name, (cls, help_text, metrics) in list(self._families.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {cls.kind}')
+            for labels, metric in list(metrics.items()):
+                lines.extend(metric.samples(name, labels))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def serve(port, host='127.0.0.1', registry=REGISTRY):
+    """Запускает в фоновом потоке HTTP-сервер с эндпоинтом /metrics."""
+    class MetricsHandler(http_server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != METRICS_PATH:
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http_server.ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,101 @@
+from collections import namedtuple
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+
+Recorded = namedtuple(
+    'Recorded', ('tenant', 'at', 'from_date', 'latency', 'response')
+)
+
+
+class Recorder:
+    """Дописывает сырые ответы API со временем в файл JSON Lines.
+
+    Файл открывается при первой записи, так что выключенная запись
+    ничего не стоит. Каждая строка сбрасывается на диск сразу, чтобы
+    запись не терялась при падении бота.
+    """
+
+    def __init__(self, path):
+        """Запоминает путь к файлу записи."""
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def record(self, tenant, from_date, response, latency):
+        """Дописывает ответ API студенту tenant на запрос с from_date."""
+        line = json.dumps(
+            Recorded(tenant, time.time(), from_date, latency, response)
+            ._asdict(),
+            ensure_ascii=False
+        ) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        """Закрывает файл записи, если он был открыт."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_records(path):
+    """Читает записанные ответы API в порядке записи."""
+    with open(path, encoding='utf-8') as file:
+        return [Recorded(**json.loads(line)) for line in file if line.strip()]
+
+
+class Player:
+    """Выдаёт записи с теми же паузами, что были при записи.
+
+    speed ускоряет воспроизведение во столько же раз, при speed 0
+    записи выдаются без пауз, так быстро, как их успевают разобрать.
+    """
+
+    def __init__(self, records, speed=1.0, clock=time.monotonic,
+                 sleep=time.sleep):
+        """Принимает записи, скорость и часы для отсчёта пауз."""
+        self.records = records
+        self.speed = speed
+        self.clock = clock
+        self.sleep = sleep
+
+    def __iter__(self):
+        """Перебирает записи, выдерживая паузы между ними."""
+        started = self.clock()
+        first = None
+        for record in self.records:
+            if first is None:
+                first = record.at
+            if self.speed:
+                wait = (
+                    started + (record.at - first) / self.speed - self.clock()
+                )
+                if wait > 0:
+                    self.sleep(wait)
+            yield record
+
+
+class DryRunBot:
+    """Бот без сети: складывает отправленные сообщения в список."""
+
+    def __init__(self):
+        """Создаёт бота с пустым списком отправленных сообщений."""
+        self.sent = []
+
+    def send_message(self, chat_id, text, **options):
+        """Запоминает сообщение и возвращает его с номером."""
+        self.sent.append((chat_id, text))
+        return SimpleNamespace(
+            message_id=len(self.sent), chat_id=chat_id, text=text
+        )
+
+    def get_updates(self, offset=None, timeout=0):
+        """Команд в сухом прогоне нет."""
+        return []
@@ -0,0 +1,155 @@
+import heapq
+import itertools
+import random
+
+
+BASE_PERIOD = 600
+REVIEWING_PERIOD = 120
+IDLE_PERIOD = 1800
+IDLE_AFTER = 24 * 60 * 60
+ERROR_PERIOD = 60
+MAX_ERROR_PERIOD = 3600
+REVIEWING = 'reviewing'
+
+
+class Entry:
+    """Расписание одного студента."""
+
+    __slots__ = ('tenant', 'next_run', 'failures', 'changed_at', 'removed',
+                 'paused')
+
+    def __init__(self, tenant, next_run):
+        """Планирует первый опрос на next_run."""
+        self.tenant = tenant
+        self.next_run = next_run
+        self.failures = 0
+        self.changed_at = next_run
+        self.removed = False
+        self.paused = False
+
+
+class Scheduler:
+    """Планировщик опросов с кучей времён следующего запуска.
+
+    Пока работа на проверке, студента опрашивают чаще, после суток без
+    изменений — реже, а после сетевых ошибок интервал растёт
+    экспоненциально со случайным разбросом.
+    """
+
+    def __init__(self, base_period=BASE_PERIOD,
+                 reviewing_period=REVIEWING_PERIOD, idle_period=IDLE_PERIOD,
+                 idle_after=IDLE_AFTER, error_period=ERROR_PERIOD,
+                 max_error_period=MAX_ERROR_PERIOD, backoff_errors=()):
+        """Запоминает интервалы и ошибки, после которых нужен откат."""
+        self.base_period = base_period
+        self.reviewing_period = min(reviewing_period, base_period)
+        self.idle_period = max(idle_period, base_period)
+        self.idle_after = idle_after
+        self.error_period = error_period
+        self.max_error_period = max_error_period
+        self.backoff_errors = backoff_errors
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self.lag = 0
+
+    def _push(self, entry):
+        heapq.heappush(
+            self._heap, (entry.next_run, next(self._counter), entry)
+        )
+
+    def sync(self, tenants, now):
+        """Добавляет новых студентов к опросу сейчас и убирает удалённых."""
+        names = set()
+        for tenant in tenants:
+            names.add(tenant.name)
+            entry = self._entries.get(tenant.name)
+            if entry is not None and entry.tenant is tenant:
+                continue
+            if entry is not None:
+                entry.removed = True
+            entry = self._entries[tenant.name] = Entry(tenant, now)
+            self._push(entry)
+        for name in self._entries.keys() - names:
+            self._entries.pop(name).removed = True
+
+    @staticmethod
+    def _is_stale(node):
+        next_run, _, entry = node
+        return (
+            entry.removed or entry.paused or entry.next_run != next_run
+        )
+
+    def due(self, now):
+        """Забирает из кучи студентов, которым пора делать опрос.
+
+        В lag запоминается опоздание самого просроченного из них.
+        """
+        tenants = []
+        self.lag = 0
+        while self._heap and self._heap[0][0] <= now:
+            node = heapq.heappop(self._heap)
+            if not self._is_stale(node):
+                tenants.append(node[2].tenant)
+                self.lag = max(self.lag, now - node[0])
+        return tenants
+
+    def period(self, entry, now, changed, error):
+        """Выбирает интервал до следующего опроса студента.
+
+        Обычный интервал студента берётся из tenant.period, если он задан.
+        Если ошибка несёт retry_after, опрос не делается раньше него.
+        """
+        if isinstance(error, self.backoff_errors):
+            entry.failures += 1
+            period = min(
+                self.max_error_period,
+                self.error_period * 2 ** (entry.failures - 1)
+            )
+            return max(
+                period * random.uniform(0.5, 1.5),
+                getattr(error, 'retry_after', None) or 0
+            )
+        entry.failures = 0
+        if changed:
+            entry.changed_at = now
+        base_period = entry.tenant.period or self.base_period
+        if REVIEWING in entry.tenant.statuses.values():
+            return min(self.reviewing_period, base_period)
+        if now - entry.changed_at >= self.idle_after:
+            return max(self.idle_period, base_period)
+        return base_period
+
+    def reschedule(self, tenant, now, changed=False, error=None):
+        """Планирует следующий опрос студента по итогам текущего."""
+        entry = self._entries.get(tenant.name)
+        if entry is None or entry.tenant is not tenant:
+            return
+        entry.next_run = now + self.period(entry, now, changed, error)
+        self._push(entry)
+
+    def pause(self, name):
+        """Снимает студента с опроса до вызова resume."""
+        entry = self._entries.get(name)
+        if entry is None or entry.paused:
+            return False
+        entry.paused = True
+        return True
+
+    def resume(self, name, now):
+        """Возвращает студента к опросу, первый опрос — сейчас."""
+        entry = self._entries.get(name)
+        if entry is None or not entry.paused:
+            return False
+        entry.paused = False
+        entry.next_run = now
+        self._push(entry)
+        return True
+
+    def delay(self, now):
+        """Возвращает число секунд до ближайшего опроса."""
+        while self._heap and self._is_stale(self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return self.base_period
+        return max(0, round(self._heap[0][0] - now, 3))
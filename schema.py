@@ -0,0 +1,55 @@
+from collections import namedtuple
+
+
+WRONG_TYPE_OF_RESPONSE = 'Got wrong type of response: {0}'
+RESPONSE_STRUCTURE_NO_HOMEWORKS = (
+    'Got error with response structure, no homeworks'
+)
+TYPE_ERROR_IN_HOMEWORKS_JSON = 'Got {0} homeworks instead of list'
+WRONG_TYPE_OF_HOMEWORK = 'Got {0} homework instead of dict'
+NO_STATUS_IN_PARSED_HOMEWORK = 'No status in parsed homework {0}'
+WRONG_STATUS_IN_PARSED_HOMEWORK = 'Bad status {0} in paresd homework'
+WRONG_NAME_IN_PARSED_HOMEWORK = 'Problems with homework_name in homework {0}'
+
+MISSING = object()
+
+Homework = namedtuple('Homework', ('key', 'name', 'status'))
+
+
+class ResponseValidator:
+    """Проверяет ответ API за один проход и собирает записи Homework.
+
+    Допустимые статусы фиксируются при создании, поэтому проверка
+    работы — несколько обращений к словарю и одно к множеству.
+    """
+
+    def __init__(self, statuses):
+        """Запоминает допустимые статусы работ."""
+        self.statuses = frozenset(statuses)
+
+    def homework(self, data):
+        """Проверяет одну работу и возвращает её запись."""
+        if not isinstance(data, dict):
+            raise TypeError(WRONG_TYPE_OF_HOMEWORK.format(type(data)))
+        status = data.get('status', MISSING)
+        if status is MISSING:
+            raise KeyError(NO_STATUS_IN_PARSED_HOMEWORK.format(data))
+        if status not in self.statuses:
+            raise ValueError(WRONG_STATUS_IN_PARSED_HOMEWORK.format(status))
+        name = data.get('homework_name', MISSING)
+        if name is MISSING:
+            raise KeyError(WRONG_NAME_IN_PARSED_HOMEWORK.format(data))
+        return Homework(str(data.get('id', name)), name, status)
+
+    def response(self, data):
+        """Проверяет ответ API и возвращает записи всех его работ."""
+        if not isinstance(data, dict):
+            raise TypeError(WRONG_TYPE_OF_RESPONSE.format(type(data)))
+        homeworks = data.get('homeworks', MISSING)
+        if homeworks is MISSING:
+            raise KeyError(RESPONSE_STRUCTURE_NO_HOMEWORKS)
+        if not isinstance(homeworks, list):
+            raise TypeError(TYPE_ERROR_IN_HOMEWORKS_JSON.format(
+                type(homeworks)
+            ))
+        return [self.homework(homework) for homework in homeworks]
@@ -0,0 +1,120 @@
+from bisect import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+REPLICAS = 100
+HEARTBEAT_INTERVAL = 15
+NO_WORKERS = 'Hash ring has no workers'
+
+
+def hash_key(key):
+    """Возвращает 64-битный хеш строки, одинаковый во всех процессах."""
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Кольцо согласованного хеширования студентов по процессам.
+
+    У каждого процесса replicas точек на кольце, студент достаётся
+    процессу с ближайшей точкой по часовой стрелке. При добавлении
+    или удалении процесса переезжает примерно 1/N студентов.
+    """
+
+    def __init__(self, workers=(), replicas=REPLICAS):
+        """Размещает процессы на кольце."""
+        self.replicas = replicas
+        self._points = []
+        self._owners = []
+        for worker in workers:
+            self.add(worker)
+
+    def add(self, worker):
+        """Добавляет процесс на кольцо."""
+        points = dict(zip(self._points, self._owners))
+        for replica in range(self.replicas):
+            points[hash_key(f'{worker}#{replica}')] = worker
+        self._points = sorted(points)
+        self._owners = [points[point] for point in self._points]
+
+    def remove(self, worker):
+        """Убирает процесс с кольца."""
+        kept = [
+            (point, owner)
+            for point, owner in zip(self._points, self._owners)
+            if owner != worker
+        ]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node(self, key):
+        """Возвращает процесс, которому принадлежит ключ."""
+        if not self._points:
+            raise LookupError(NO_WORKERS)
+        index = bisect(self._points, hash_key(key)) % len(self._points)
+        return self._owners[index]
+
+
+def shard(tenants, worker, workers):
+    """Оставляет студентов, которые по кольцу достаются процессу worker."""
+    ring = HashRing(workers)
+    return [tenant for tenant in tenants if ring.node(tenant.name) == worker]
+
+
+class HealthReporter:
+    """Отправляет супервизору отчёт о здоровье после каждого цикла.
+
+    Отчёт — строка JSON в канал, унаследованный от супервизора.
+    Между отчётами фоновый поток раз в heartbeat секунд шлёт пульс,
+    чтобы долгий цикл опроса большого шарда не принимался за зависание.
+    """
+
+    def __init__(self, worker, fd, heartbeat=HEARTBEAT_INTERVAL):
+        """Открывает канал fd на запись и запускает пульс."""
+        self.worker = worker
+        self.heartbeat = heartbeat
+        self.pipe = os.fdopen(fd, 'w', buffering=1, encoding='utf-8')
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        if heartbeat:
+            threading.Thread(target=self._beat, daemon=True).start()
+
+    def _send(self, **fields):
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self.pipe.write(json.dumps({
+                'worker': self.worker,
+                'pid': os.getpid(),
+                **fields,
+                'time': time.time(),
+            }) + '\n')
+
+    def _beat(self):
+        while not self._closed.wait(self.heartbeat):
+            try:
+                self._send(heartbeat=True, delay=self.heartbeat)
+            except OSError:
+                return
+
+    def report(self, polled, errors, delay):
+        """Сообщает итоги цикла и через сколько секунд ждать следующий."""
+        self._send(polled=polled, errors=errors, delay=delay)
+
+    def close(self):
+        """Останавливает пульс и закрывает канал."""
+        with self._lock:
+            self._closed.set()
+            self.pipe.close()
+
+
+def open_reporter(worker, fd, heartbeat=HEARTBEAT_INTERVAL):
+    """Возвращает HealthReporter или None, если процесс запущен не шардом."""
+    if not worker or fd is None:
+        return None
+    return HealthReporter(worker, int(fd), heartbeat)
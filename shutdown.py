@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+import logging
+import signal
+
+
+SHUTDOWN_REQUESTED_LOG = 'Got signal {0}, shutting down'
+
+logger = logging.getLogger(__name__)
+
+
+class GracefulExit(Exception):
+    """Shutdown was requested while the bot was idle."""
+
+
+class ShutdownSignal:
+    """Переводит SIGTERM и SIGINT в плавную остановку.
+
+    Сигнал только поднимает флаг и вызывает on_request. Прервать
+    можно лишь ожидание внутри idle(): там обработчик бросает
+    GracefulExit, а опрос и отправка сообщений доходят до конца.
+    """
+
+    def __init__(self, on_request=None):
+        """Запоминает, кого известить о запросе остановки."""
+        self.on_request = on_request
+        self.requested = False
+        self.waiting = False
+        self._previous = {}
+
+    def install(self, signals=(signal.SIGTERM, signal.SIGINT)):
+        """Ставит обработчик на сигналы остановки."""
+        for signum in signals:
+            self._previous[signum] = signal.signal(signum, self.handle)
+
+    def uninstall(self):
+        """Возвращает прежние обработчики сигналов."""
+        for signum, handler in self._previous.items():
+            signal.signal(signum, handler)
+        self._previous.clear()
+
+    def handle(self, signum, frame):
+        """Запоминает запрос остановки и прерывает ожидание."""
+        logger.info(SHUTDOWN_REQUESTED_LOG.format(signal.Signals(signum).name))
+        self.requested = True
+        if self.on_request is not None:
+            self.on_request()
+        if self.waiting:
+            self.waiting = False
+            raise GracefulExit()
+
+    @contextmanager
+    def idle(self):
+        """Отмечает ожидание, которое сигнал остановки может прервать."""
+        if self.requested:
+            raise GracefulExit()
+        self.waiting = True
+        try:
+            yield
+        finally:
+            self.waiting = False
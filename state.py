@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+
+
+FLUSH_INTERVAL = 30
+UNKNOWN_BACKEND = 'Unknown state backend {0}, expected one of {1}'
+MISSING_PATH = 'State backend {0} needs STATE_PATH'
+TORN_LINE_LOG = 'Dropped unreadable line {0} of {1}'
+
+logger = logging.getLogger(__name__)
+
+
+class StateStore:
+    """Хранилище курсора и последних статусов работ студентов.
+
+    Записи читаются один раз при открытии, а изменения копятся в памяти
+    и сбрасываются на диск пачкой не чаще раза в flush_interval секунд.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL):
+        """Загружает все сохранённые записи."""
+        self.flush_interval = flush_interval
+        self.flushed_at = time.monotonic()
+        self._records = dict(self._read())
+        self._dirty = {}
+
+    def _read(self):
+        """Возвращает пары (имя студента, запись) из хранилища."""
+        return ()
+
+    def _write(self, records):
+        """Записывает изменённые записи в хранилище."""
+
+    def restore(self, tenants):
+        """Восстанавливает курсор, статусы и названия работ студентов."""
+        for tenant in tenants:
+            record = self._records.get(tenant.name)
+            if record is not None:
+                tenant.timestamp = record['cursor']
+                tenant.statuses = dict(record['statuses'])
+                tenant.names = dict(record.get('names') or {})
+
+    def save(self, tenant):
+        """Запоминает состояние студента до следующего сброса.
+
+        Неизменившееся состояние в хранилище не пишется.
+        """
+        record = {'cursor': tenant.timestamp,
+                  'statuses': dict(tenant.statuses),
+                  'names': dict(tenant.names)}
+        if self._records.get(tenant.name) == record:
+            return
+        self._records[tenant.name] = record
+        self._dirty[tenant.name] = record
+
+    def flush(self):
+        """Сбрасывает накопленные изменения в хранилище."""
+        if self._dirty:
+            self._write(self._dirty)
+            self._dirty = {}
+        self.flushed_at = time.monotonic()
+
+    def flush_if_due(self):
+        """Сбрасывает изменения, если прошло flush_interval секунд."""
+        if time.monotonic() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    def close(self):
+        """Сбрасывает оставшиеся изменения."""
+        self.flush()
+
+
+class MemoryStateStore(StateStore):
+    """Хранилище в памяти процесса."""
+
+
+class SQLiteStateStore(StateStore):
+    """Хранилище в таблице SQLite."""
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL):
+        """Открывает базу и создаёт таблицу состояния.
+
+        В таблицу прежней версии без названий работ добавляется столбец.
+        """
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS tenant_state ('
+                'name TEXT PRIMARY KEY, cursor INTEGER, statuses TEXT, '
+                'names TEXT)'
+            )
+            columns = {
+                row[1] for row in
+                self.connection.execute('PRAGMA table_info(tenant_state)')
+            }
+            if 'names' not in columns:
+                self.connection.execute(
+                    'ALTER TABLE tenant_state ADD COLUMN names TEXT'
+                )
+        super().__init__(flush_interval)
+
+    def _read(self):
+        for name, cursor, statuses, names in self.connection.execute(
+            'SELECT name, cursor, statuses, names FROM tenant_state'
+        ):
+            yield name, {
+                'cursor': cursor,
+                'statuses': json.loads(statuses),
+                'names': json.loads(names or '{}'),
+            }
+
+    def _write(self, records):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO tenant_state '
+                '(name, cursor, statuses, names) VALUES (?, ?, ?, ?)',
+                [
+                    (
+                        name, record['cursor'],
+                        json.dumps(record['statuses']),
+                        json.dumps(record['names'], ensure_ascii=False)
+                    )
+                    for name, record in records.items()
+                ]
+            )
+
+    def close(self):
+        """Сбрасывает изменения и закрывает базу."""
+        super().close()
+        self.connection.close()
+
+
+class FileStateStore(StateStore):
+    """Хранилище в дописываемом JSON Lines файле.
+
+    Каждый сброс дописывает изменённые записи в конец файла, при чтении
+    побеждает последняя запись студента. Когда устаревших строк
+    становится больше актуальных, файл переписывается заново.
+    Недописанная при падении строка пропускается, а оборванный хвост
+    файла отрезается, чтобы следующая запись начиналась с новой строки.
+    """
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL):
+        """Читает файл и при необходимости сжимает его."""
+        self.path = path
+        self.lines = 0
+        super().__init__(flush_interval)
+        self.compact_if_stale()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, 'rb+') as file:
+            for number, line in enumerate(file, 1):
+                try:
+                    name, record = json.loads(line)
+                except ValueError:
+                    logger.warning(TORN_LINE_LOG.format(number, self.path))
+                    if not line.endswith(b'\n'):
+                        file.truncate(offset)
+                        break
+                else:
+                    if not line.endswith(b'\n'):
+                        file.seek(0, os.SEEK_END)
+                        file.write(b'\n')
+                    self.lines += 1
+                    yield name, record
+                offset += len(line)
+
+    def _write(self, records):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.writelines(
+                json.dumps([name, record], ensure_ascii=False) + '\n'
+                for name, record in records.items()
+            )
+        self.lines += len(records)
+        self.compact_if_stale()
+
+    def compact_if_stale(self):
+        """Сжимает файл, если устаревших строк больше актуальных."""
+        if self.lines > 2 * len(self._records):
+            self.compact()
+
+    def compact(self):
+        """Переписывает файл, оставляя по одной записи на студента."""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.writelines(
+                json.dumps([name, record], ensure_ascii=False) + '\n'
+                for name, record in self._records.items()
+            )
+        os.replace(temp_path, self.path)
+        self.lines = len(self._records)
+
+
+BACKENDS = {
+    'memory': MemoryStateStore,
+    'sqlite': SQLiteStateStore,
+    'file': FileStateStore,
+}
+
+
+def open_store(backend='memory', path=None, flush_interval=FLUSH_INTERVAL):
+    """Открывает хранилище состояния по имени бэкенда."""
+    if backend not in BACKENDS:
+        raise ValueError(UNKNOWN_BACKEND.format(backend, list(BACKENDS)))
+    if backend == 'memory':
+        return MemoryStateStore(flush_interval)
+    if not path:
+        raise ValueError(MISSING_PATH.format(backend))
+    return BACKENDS[backend](path, flush_interval)
@@ -0,0 +1,117 @@
+import codecs
+import json
+import re
+
+from schema import (
+    RESPONSE_STRUCTURE_NO_HOMEWORKS, TYPE_ERROR_IN_HOMEWORKS_JSON,
+    WRONG_TYPE_OF_RESPONSE
+)
+
+
+CHUNK_SIZE = 64 * 1024
+UNEXPECTED_END = 'Unexpected end of data'
+EXPECTING = 'Expecting {0!r}'
+
+WHITESPACE = re.compile(r'\s*')
+
+
+class StreamedResponse:
+    """Ответ API, который разбирается по мере чтения тела.
+
+    Итерация выдаёт работы из списка homeworks по одной, в памяти
+    держится только текущая работа и непрочитанный остаток куска.
+    Остальные поля верхнего уровня (current_date, code, error)
+    собираются в meta.
+    """
+
+    def __init__(self, chunks):
+        """Принимает итератор кусков тела ответа в байтах."""
+        self.meta = {}
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            self._buffer += self._decoder.decode(b'', final=True)
+        else:
+            self._buffer += self._decoder.decode(chunk)
+        return True
+
+    def _peek(self):
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise json.JSONDecodeError(
+                    UNEXPECTED_END, self._buffer, self._pos
+                )
+
+    def _take(self, expected):
+        char = self._peek()
+        if char not in expected:
+            raise json.JSONDecodeError(
+                EXPECTING.format(expected), self._buffer, self._pos
+            )
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end < len(self._buffer) or not self._fill():
+                self._pos = end
+                return value
+
+    def _homeworks(self):
+        if self._peek() != '[':
+            raise TypeError(
+                TYPE_ERROR_IN_HOMEWORKS_JSON.format(type(self._value()))
+            )
+        self._pos += 1
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._take(',]') == ']':
+                return
+
+    def __iter__(self):
+        """Выдаёт работы по одной и заполняет meta."""
+        if self._peek() != '{':
+            raise TypeError(WRONG_TYPE_OF_RESPONSE.format(type(self._value())))
+        self._pos += 1
+        has_homeworks = False
+        if self._peek() == '}':
+            self._pos += 1
+        else:
+            while True:
+                key = self._value()
+                self._take(':')
+                if key == 'homeworks':
+                    has_homeworks = True
+                    yield from self._homeworks()
+                else:
+                    self.meta[key] = self._value()
+                if self._take(',}') == '}':
+                    break
+        if not has_homeworks and not self.meta.keys() & {'error', 'code'}:
+            raise KeyError(RESPONSE_STRUCTURE_NO_HOMEWORKS)
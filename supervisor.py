@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import time
+
+
+WORKERS = int(os.getenv('SUPERVISOR_WORKERS', os.cpu_count() or 1))
+WORKER_COMMAND = [sys.executable, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'homework.py'
+)]
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+HEALTH_GRACE = 60
+RESTART_DELAY = 5
+STARTUP_TIMEOUT = 120
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 25))
+STOP_TIMEOUT = SHUTDOWN_TIMEOUT + 5
+WORKER_PATHS = ('STATE_PATH', 'HISTORY_PATH', 'RECORD_FILE')
+
+WORKER_STARTED_LOG = 'Started worker {0} with pid {1}'
+WORKER_EXITED_LOG = 'Worker {0} exited with code {1}'
+WORKER_SILENT_LOG = 'Worker {0} sent no health report for {1:.0f} s'
+WORKER_ERRORS_LOG = 'Worker {0} had {1} errors in the last cycle'
+BAD_REPORT_LOG = 'Bad health report from worker {0}: {1!r}'
+COMMANDS_DISABLED_LOG = (
+    'COMMANDS=1 is ignored under the supervisor: shards would share '
+    'one getUpdates stream'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def worker_path(path, name):
+    """Добавляет имя шарда к пути файла перед расширением."""
+    root, extension = os.path.splitext(path)
+    return f'{root}.{name}{extension}'
+
+
+class Worker:
+    """Процесс-шард и его последний отчёт о здоровье."""
+
+    def __init__(self, name, process, pipe, now):
+        """Запоминает процесс и канал его отчётов."""
+        self.name = name
+        self.process = process
+        self.pipe = pipe
+        self.report = None
+        self.deadline = now + STARTUP_TIMEOUT
+
+
+class Supervisor:
+    """Запускает процессы-шарды и перезапускает упавшие и зависшие.
+
+    Студенты распределяются по шардам согласованным хешированием:
+    каждому процессу передаются имена всех шардов и его собственное.
+    Файлы состояния, журнала и записи у каждого шарда свои, а команды
+    чатов в шардах выключены: getUpdates у бота может слушать только
+    один процесс.
+    """
+
+    def __init__(self, count=WORKERS, command=WORKER_COMMAND,
+                 metrics_port=METRICS_PORT, health_grace=HEALTH_GRACE):
+        """Готовит имена шардов, процессы пока не запускаются."""
+        self.names = [f'worker-{index}' for index in range(count)]
+        self.command = command
+        self.metrics_port = metrics_port
+        self.health_grace = health_grace
+        self.workers = {}
+        self.selector = selectors.DefaultSelector()
+        self.running = False
+
+    def environment(self, name):
+        """Возвращает окружение процесса-шарда."""
+        env = dict(
+            os.environ, WORKER_NAME=name, WORKERS=','.join(self.names),
+            COMMANDS='0'
+        )
+        for variable in WORKER_PATHS:
+            if env.get(variable):
+                env[variable] = worker_path(env[variable], name)
+        if self.metrics_port:
+            env['METRICS_PORT'] = str(
+                self.metrics_port + 1 + self.names.index(name)
+            )
+        return env
+
+    def start(self, name):
+        """Запускает процесс-шард с каналом для отчётов о здоровье."""
+        read_fd, write_fd = os.pipe()
+        env = self.environment(name)
+        env['HEALTH_FD'] = str(write_fd)
+        try:
+            process = subprocess.Popen(
+                self.command, env=env, pass_fds=(write_fd,)
+            )
+        finally:
+            os.close(write_fd)
+        pipe = os.fdopen(read_fd, encoding='utf-8')
+        worker = Worker(name, process, pipe, time.monotonic())
+        self.workers[name] = worker
+        self.selector.register(pipe, selectors.EVENT_READ, worker)
+        logger.info(WORKER_STARTED_LOG.format(name, process.pid))
+
+    def close_pipe(self, worker):
+        """Закрывает канал отчётов процесса-шарда."""
+        if not worker.pipe.closed:
+            self.selector.unregister(worker.pipe)
+            worker.pipe.close()
+
+    def stop(self, workers, timeout=STOP_TIMEOUT):
+        """Останавливает процессы-шарды и закрывает их каналы.
+
+        SIGTERM уходит всем сразу, и у каждого есть timeout секунд,
+        чтобы дослать очередь сообщений. Кто не успел, получает SIGKILL.
+        """
+        for worker in workers:
+            self.close_pipe(worker)
+            if worker.process.poll() is None:
+                worker.process.terminate()
+        deadline = time.monotonic() + timeout
+        for worker in workers:
+            try:
+                worker.process.wait(max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+                worker.process.wait()
+
+    def restart(self, worker):
+        """Перезапускает процесс-шард."""
+        self.stop([worker])
+        self.start(worker.name)
+
+    def receive(self, worker, now):
+        """Читает отчёт о здоровье или пульс из канала процесса.
+
+        И то и другое сдвигает срок, к которому ждать следующую весть.
+        """
+        line = worker.pipe.readline()
+        if not line:
+            return False
+        try:
+            report = json.loads(line)
+            worker.deadline = now + report['delay'] + self.health_grace
+        except (ValueError, KeyError, TypeError):
+            logger.warning(BAD_REPORT_LOG.format(worker.name, line))
+            return True
+        if report.get('heartbeat'):
+            return True
+        worker.report = report
+        if report.get('errors'):
+            logger.warning(
+                WORKER_ERRORS_LOG.format(worker.name, report['errors'])
+            )
+        return True
+
+    def check(self, now):
+        """Возвращает шарды, которые упали или перестали слать отчёты."""
+        failed = []
+        for worker in self.workers.values():
+            code = worker.process.poll()
+            if code is not None:
+                logger.error(WORKER_EXITED_LOG.format(worker.name, code))
+                failed.append(worker)
+            elif now > worker.deadline:
+                logger.error(WORKER_SILENT_LOG.format(
+                    worker.name, now - worker.deadline + self.health_grace
+                ))
+                failed.append(worker)
+        return failed
+
+    def step(self, timeout):
+        """Ждёт отчёты до timeout секунд и перезапускает больные шарды."""
+        for key, _ in self.selector.select(timeout):
+            worker = key.data
+            if not self.receive(worker, time.monotonic()):
+                self.close_pipe(worker)
+        for worker in self.check(time.monotonic()):
+            self.restart(worker)
+
+    def run(self):
+        """Запускает все шарды и следит за ними до сигнала остановки."""
+        self.running = True
+        for name in self.names:
+            self.start(name)
+        try:
+            while self.running:
+                self.step(RESTART_DELAY)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Останавливает все шарды."""
+        self.running = False
+        self.stop(list(self.workers.values()))
+        self.workers.clear()
+
+
+def main():
+    """Запускает супервизор процессов-шардов."""
+    logging.basicConfig(
+        level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s'
+    )
+    if os.getenv('COMMANDS') == '1':
+        logger.warning(COMMANDS_DISABLED_LOG)
+    supervisor = Supervisor()
+
+    def stop(signum, frame):
+        supervisor.running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    supervisor.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+from contextvars import ContextVar
+import time
+
+
+DUPLICATE_TENANT = 'Tenant {0} is already registered'
+UNKNOWN_TENANT = 'Unknown tenant {0}'
+
+CURRENT_TENANT = ContextVar('current_tenant', default=None)
+
+
+class Tenant:
+    """Студент: токен Практикума, чат Telegram и состояние опроса."""
+
+    __slots__ = ('name', 'token', 'chat_id', 'headers', 'timestamp',
+                 'statuses', 'names', 'locale', 'markup', 'period')
+
+    def __init__(self, token, chat_id, name=None, timestamp=None,
+                 statuses=None, locale=None, markup=None, period=None,
+                 names=None):
+        """Создаёт запись студента с начальным состоянием опроса.
+
+        statuses и names — последние статусы и названия работ по их
+        ключам. locale и markup задают язык и разметку уведомлений,
+        period — обычный интервал опроса; None — настройки процесса
+        по умолчанию.
+        """
+        self.name = str(chat_id) if name is None else name
+        self.token = token
+        self.chat_id = chat_id
+        self.headers = {'Authorization': f'OAuth {token}'}
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
+        self.statuses = {} if statuses is None else statuses
+        self.names = {} if names is None else names
+        self.locale = locale
+        self.markup = markup
+        self.period = period
+
+    def configure(self, other):
+        """Берёт настройки другой записи, сохраняя состояние опроса."""
+        self.token = other.token
+        self.chat_id = other.chat_id
+        self.headers = other.headers
+        self.locale = other.locale
+        self.markup = other.markup
+        self.period = other.period
+
+    def __repr__(self):
+        """Не показывает токен в логах."""
+        return f'Tenant(name={self.name!r}, chat_id={self.chat_id!r})'
+
+
+class TenantRegistry:
+    """Реестр студентов, которых опрашивает один процесс."""
+
+    def __init__(self, tenants=()):
+        """Регистрирует переданных студентов."""
+        self._tenants = {}
+        for tenant in tenants:
+            self.add(tenant)
+
+    def add(self, tenant):
+        """Добавляет студента в реестр."""
+        if tenant.name in self._tenants:
+            raise ValueError(DUPLICATE_TENANT.format(tenant.name))
+        self._tenants[tenant.name] = tenant
+
+    def remove(self, name):
+        """Удаляет студента из реестра."""
+        if self._tenants.pop(name, None) is None:
+            raise KeyError(UNKNOWN_TENANT.format(name))
+
+    def sync(self, tenants):
+        """Приводит реестр к новому списку студентов.
+
+        У оставшихся студентов обновляются настройки, а курсор и
+        статусы сохраняются. Возвращает списки добавленных и удалённых.
+        """
+        fresh = {tenant.name: tenant for tenant in tenants}
+        removed = [
+            self._tenants.pop(name)
+            for name in list(self._tenants) if name not in fresh
+        ]
+        added = []
+        for name, tenant in fresh.items():
+            current = self._tenants.get(name)
+            if current is None:
+                self._tenants[name] = tenant
+                added.append(tenant)
+            else:
+                current.configure(tenant)
+        return added, removed
+
+    def get(self, name):
+        """Возвращает студента по имени."""
+        return self._tenants.get(name)
+
+    def __iter__(self):
+        """Перебирает зарегистрированных студентов."""
+        return iter(list(self._tenants.values()))
+
+    def __len__(self):
+        """Возвращает количество студентов."""
+        return len(self._tenants)
@@ -3,6 +3,7 @@ import string
 from datetime import datetime
 
 import pytest
+import requests
 
 
 @pytest.fixture
@@ -29,3 +30,12 @@ def random_message():
         letters = string.ascii_letters
         return ''.join(random.choice(letters) for _ in range(string_length))
     return random_string()
+
+
+@pytest.fixture
+def session_uses_requests_get(monkeypatch, homework_module):
+    """Route the pooled session through a mocked `requests.get`."""
+    monkeypatch.setattr(
+        homework_module.session, 'get',
+        lambda *args, **kwargs: requests.get(*args, **kwargs)
+    )
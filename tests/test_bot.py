@@ -11,6 +11,9 @@ import telegram
 import utils
 
 
+pytestmark = pytest.mark.usefixtures('session_uses_requests_get')
+
+
 def create_mock_response_get_with_custom_status_and_data(random_timestamp,
                                                          http_status,
                                                          data):
@@ -0,0 +1,78 @@
+import pytest
+
+from breaker import CircuitBreaker, CircuitOpen, ErrorDigest, fingerprint
+
+
+class TestFingerprint:
+
+    def test_numbers_and_params_are_ignored(self):
+        first = ConnectionError("url=x; params={'from_date': 1}; code 502")
+        second = ConnectionError("url=x; params={'from_date': 9}; code 503")
+        assert fingerprint(first) == fingerprint(second)
+        assert fingerprint(first) != fingerprint(ValueError(str(first)))
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_tries_once(self):
+        breaker = CircuitBreaker(threshold=2, reset_timeout=10,
+                                 errors=(ConnectionError,))
+        breaker.record(0, ConnectionError())
+        breaker.check(0)
+        breaker.record(0, ConnectionError())
+        with pytest.raises(CircuitOpen):
+            breaker.check(5)
+        breaker.check(10)
+        with pytest.raises(CircuitOpen):
+            breaker.check(10)
+        breaker.record(11, ConnectionError())
+        with pytest.raises(CircuitOpen):
+            breaker.check(20)
+        breaker.check(21)
+        breaker.record(21)
+        breaker.check(21)
+
+    def test_other_errors_are_ignored(self):
+        breaker = CircuitBreaker(threshold=1, errors=(ConnectionError,))
+        breaker.record(0, ValueError())
+        breaker.check(0)
+
+    def test_uncounted_trial_failure_allows_new_trial(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=10,
+                                 errors=(ConnectionError,))
+        breaker.record(0, ConnectionError())
+        breaker.check(10)
+        breaker.record(10, ValueError())
+        breaker.check(11)
+        breaker.record(11)
+        breaker.check(12)
+
+    def test_counts_predicate(self):
+        breaker = CircuitBreaker(
+            threshold=1, counts=lambda error: str(error) == 'down'
+        )
+        breaker.record(0, ConnectionError('forbidden'))
+        breaker.check(0)
+        breaker.record(0, ConnectionError('down'))
+        with pytest.raises(CircuitOpen):
+            breaker.check(0)
+
+
+class TestErrorDigest:
+
+    def test_repeats_are_summarised(self):
+        digest = ErrorDigest(interval=100)
+        error = ConnectionError('down at 1')
+        assert digest.report('1', error, 'down', 0) == 'down'
+        assert digest.report('1', ConnectionError('down at 2'), 'down',
+                             10) is None
+        assert digest.report('1', error, 'down', 20) is None
+        assert '3' in digest.report('1', error, 'down', 100)
+        assert digest.report('1', error, 'down', 110) is None
+        assert '1' in digest.resolve('1')
+        assert digest.resolve('1') is None
+
+    def test_new_error_is_sent(self):
+        digest = ErrorDigest()
+        assert digest.report('1', ConnectionError(), 'down', 0) == 'down'
+        assert digest.report('1', ValueError(), 'bad', 1) == 'bad'
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from commands import CommandHandler, History
+from delivery import DeliveryQueue
+from messages import CATALOGS, PLAIN, Renderer
+from scheduler import Scheduler
+from schema import Homework
+from tenants import Tenant
+import utils
+
+
+pytestmark = pytest.mark.usefixtures('session_uses_requests_get')
+
+
+VERDICTS = {'approved': 'Принята.', 'reviewing': 'На проверке.'}
+CATALOG = CATALOGS['ru']._replace(verdicts=VERDICTS)
+
+
+def make_update(update_id, chat_id, text):
+    return SimpleNamespace(
+        update_id=update_id,
+        message=SimpleNamespace(chat_id=chat_id, text=text)
+    )
+
+
+class CommandBot:
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.offsets = []
+        self.sent = []
+
+    def get_updates(self, offset=None, timeout=0):
+        self.offsets.append(offset)
+        if self.batches:
+            return self.batches.pop(0)
+        time.sleep(timeout)
+        return []
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+        return text
+
+
+def make_handler(tenant, history=None, locale='ru'):
+    scheduler = Scheduler()
+    scheduler.sync([tenant], now=0)
+    return CommandHandler(
+        None, scheduler, None, history or History(),
+        Renderer({'ru': CATALOG, 'en': CATALOGS['en']}),
+        lambda tenant: (locale, PLAIN)
+    )
+
+
+class TestCommandHandler:
+
+    def test_status_uses_known_names(self):
+        tenant = Tenant('token', 1, statuses={'7': 'approved', '8': 'new'})
+        history = History()
+        history.record(tenant.name, Homework('7', 'hw7', 'approved'))
+        handler = make_handler(tenant, history)
+        assert handler.answer(tenant, '/status') == 'hw7: Принята.\n8: new'
+
+    def test_status_names_survive_restart(self):
+        tenant = Tenant('token', 1, statuses={'7': 'approved'},
+                        names={'7': 'hw7'})
+        handler = make_handler(tenant)
+        assert handler.answer(tenant, '/status') == 'hw7: Принята.'
+
+    def test_history_is_bounded(self):
+        tenant = Tenant('token', 1)
+        history = History(size=2)
+        handler = make_handler(tenant, history)
+        assert handler.answer(tenant, '/history') == CATALOG.no_history
+        for status in ('reviewing', 'approved', 'reviewing'):
+            history.record(tenant.name, Homework('7', 'hw7', status))
+        assert handler.answer(tenant, '/history@bot') == (
+            'hw7: Принята.\nhw7: На проверке.'
+        )
+
+    def test_pause_and_resume(self):
+        tenant = Tenant('token', 1)
+        handler = make_handler(tenant)
+        assert handler.answer(tenant, '/pause') == CATALOG.paused
+        assert handler.scheduler.due(10 ** 9) == []
+        assert handler.answer(tenant, '/resume') == CATALOG.resumed
+
+    def test_replies_follow_tenant_locale(self):
+        tenant = Tenant('token', 1)
+        handler = make_handler(tenant, locale='en')
+        assert handler.answer(tenant, '/pause') == CATALOGS['en'].paused
+        assert handler.answer(tenant, '/start') == CATALOGS['en'].help
+
+    def test_serve_answers_known_chats_only(self):
+        tenant = Tenant('token', 1, statuses={'7': 'approved'})
+        bot = CommandBot([
+            [make_update(5, 1, '/status'), make_update(6, 2, '/status')],
+        ])
+        handler = make_handler(tenant)
+        handler.bot = bot
+
+        async def send(recipient, text):
+            return bot.send_message(recipient.chat_id, text)
+
+        handler.queue = DeliveryQueue(send)
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(handler.serve([tenant], 1.5))
+        finally:
+            loop.close()
+        assert bot.sent == [(1, '7: Принята.')]
+        assert bot.offsets[:2] == [None, 7]
+
+    def test_resume_ends_serving(self):
+        tenant = Tenant('token', 1)
+        bot = CommandBot([[make_update(1, 1, '/resume')]])
+        handler = make_handler(tenant)
+        handler.bot = bot
+        handler.scheduler.pause(tenant.name)
+
+        async def send(recipient, text):
+            return bot.send_message(recipient.chat_id, text)
+
+        handler.queue = DeliveryQueue(send)
+        loop = asyncio.new_event_loop()
+        started = time.monotonic()
+        try:
+            loop.run_until_complete(handler.serve([tenant], 30))
+        finally:
+            loop.close()
+        assert time.monotonic() - started < 5
+        assert bot.sent == [(1, CATALOG.resumed)]
+        assert handler.scheduler.due(time.monotonic()) == [tenant]
+
+
+class TestEngineCommands:
+
+    def test_history_from_polling(self, monkeypatch, random_timestamp,
+                                  homework_module):
+        def mock_response_get(*args, **kwargs):
+            response = utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+            response.json = lambda: {
+                'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+                'current_date': random_timestamp
+            }
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        tenant = Tenant('token', 1, timestamp=random_timestamp)
+        bot = CommandBot([[make_update(1, 1, '/history')]])
+        engine = homework_module.PollingEngine(bot, commands=True)
+        try:
+            delay = engine.run_cycle([tenant])
+            assert engine.answer_commands([tenant], 1.5) == 0
+        finally:
+            engine.close()
+        assert delay == homework_module.RETRY_PERIOD
+        assert bot.sent[-1] == (
+            1, 'hw1: ' + homework_module.HOMEWORK_VERDICTS['approved']
+        )
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+import requests
+
+from conditional import ResponseCache, Validators, body_digest
+from scheduler import Scheduler
+from tenants import Tenant
+
+
+pytestmark = pytest.mark.usefixtures('session_uses_requests_get')
+
+
+BODY = {
+    'homeworks': [{'id': 1, 'homework_name': 'hw1', 'status': 'approved'}],
+    'current_date': 1,
+}
+
+
+class MockResponse:
+
+    def __init__(self, body=None, status_code=200, headers=None):
+        self.content = json.dumps(body).encode() if body else b''
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class RecordingBot:
+
+    def __init__(self, delivered=True):
+        self.sent = []
+        self.delivered = delivered
+
+    def send_message(self, chat_id, text):
+        self.sent.append(text)
+        return text if self.delivered else ''
+
+
+def run_cycles(homework_module, bot, cycles=2):
+    engine = homework_module.PollingEngine(
+        bot, scheduler=Scheduler(base_period=0), conditional_requests=True
+    )
+    tenant = Tenant('token', '12345', timestamp=0)
+    try:
+        for _ in range(cycles):
+            engine.run_cycle([tenant])
+    finally:
+        engine.close()
+    return tenant
+
+
+class TestResponseCache:
+
+    def test_digest_ignores_current_date(self):
+        assert body_digest(b'{"homeworks": [], "current_date": 1}') == (
+            body_digest(b'{"homeworks": [], "current_date":  42}')
+        )
+        assert body_digest(b'{"homeworks": []}') != body_digest(
+            b'{"homeworks": [{}]}'
+        )
+
+    def test_headers(self):
+        cache = ResponseCache()
+        assert cache.headers('a') == {}
+        cache.remember('a', Validators('"v1"', 'Mon', b''))
+        assert cache.headers('a') == {
+            'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon'
+        }
+        cache.forget('a')
+        assert cache.headers('a') == {}
+
+
+class TestConditionalPolling:
+
+    def test_same_body_not_decoded_again(self, monkeypatch, homework_module):
+        monkeypatch.setattr(
+            requests, 'get', lambda *args, **kwargs: MockResponse(BODY)
+        )
+        calls = []
+        check_response = homework_module.check_response
+        monkeypatch.setattr(
+            homework_module, 'check_response',
+            lambda response: calls.append(response) or check_response(
+                response
+            )
+        )
+        bot = RecordingBot()
+        tenant = run_cycles(homework_module, bot, cycles=3)
+        assert len(calls) == 1
+        assert len(bot.sent) == 1
+        assert tenant.timestamp == 1
+
+    def test_not_modified(self, monkeypatch, homework_module):
+        seen = []
+
+        def mock_get(*args, headers=None, **kwargs):
+            seen.append(headers.get('If-None-Match'))
+            if seen[-1] == '"v1"':
+                return MockResponse(status_code=304)
+            return MockResponse(BODY, headers={'ETag': '"v1"'})
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        bot = RecordingBot()
+        run_cycles(homework_module, bot)
+        assert seen == [None, '"v1"']
+        assert len(bot.sent) == 1
+
+    def test_undelivered_response_not_remembered(self, monkeypatch,
+                                                 homework_module):
+        monkeypatch.setattr(
+            requests, 'get', lambda *args, **kwargs: MockResponse(BODY)
+        )
+        bot = RecordingBot(delivered=False)
+        tenant = run_cycles(homework_module, bot)
+        assert len(bot.sent) == 2
+        assert tenant.statuses == {}
@@ -0,0 +1,179 @@
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+import config
+
+
+RECORDS = [
+    {'token': 'token1', 'chat_id': 1},
+    {'token': 'token2', 'chat_id': 2, 'name': 'student', 'locale': 'en',
+     'markup': 'html', 'period': 120},
+]
+
+
+def check_loaded(tenants):
+    assert [tenant.name for tenant in tenants] == ['1', 'student']
+    first, second = tenants
+    assert (first.token, first.chat_id, first.period) == ('token1', 1, None)
+    assert second.chat_id == 2
+    assert (second.locale, second.markup, second.period) == (
+        'en', 'html', 120
+    )
+
+
+class TestFormats:
+
+    def test_json(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps(RECORDS))
+        check_loaded(config.load_tenants(str(path)))
+
+    def test_yaml(self, tmp_path):
+        pytest.importorskip('yaml')
+        path = tmp_path / 'tenants.yaml'
+        path.write_text(
+            'tenants:\n'
+            '  - {token: token1, chat_id: 1}\n'
+            '  - {token: token2, chat_id: 2, name: student, locale: en,\n'
+            '     markup: html, period: 120}\n'
+        )
+        check_loaded(config.load_tenants(str(path)))
+
+    def test_toml(self, tmp_path):
+        path = tmp_path / 'tenants.toml'
+        path.write_text(
+            '[[tenants]]\ntoken = "token1"\nchat_id = 1\n'
+            '[[tenants]]\ntoken = "token2"\nchat_id = 2\nname = "student"\n'
+            'locale = "en"\nmarkup = "html"\nperiod = 120\n'
+        )
+        check_loaded(config.load_tenants(str(path)))
+
+    def test_csv(self, tmp_path):
+        path = tmp_path / 'tenants.csv'
+        path.write_text(
+            'name,token,chat_id,locale,markup,period\n'
+            ',token1,1,,,\n'
+            'student,token2,2,en,html,120\n'
+        )
+        check_loaded(config.load_tenants(str(path)))
+
+    def test_sqlite(self, tmp_path):
+        path = str(tmp_path / 'tenants.db')
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                'CREATE TABLE tenants (name TEXT, token TEXT, chat_id INTEGER,'
+                ' locale TEXT, markup TEXT, period REAL)'
+            )
+            connection.executemany(
+                'INSERT INTO tenants VALUES (?, ?, ?, ?, ?, ?)', [
+                    (None, 'token1', 1, None, None, None),
+                    ('student', 'token2', 2, 'en', 'html', 120),
+                ]
+            )
+        connection.close()
+        check_loaded(config.load_tenants(path))
+
+    def test_parse_errors_become_config_errors(self, tmp_path):
+        broken = {
+            'tenants.json': '[{"token": "token1", "chat_id"',
+            'tenants.toml': '[[tenants]\ntoken = ',
+            'tenants.db': 'not a database',
+        }
+        for name, text in broken.items():
+            path = tmp_path / name
+            path.write_text(text)
+            with pytest.raises(config.ConfigError):
+                config.load_tenants(str(path))
+
+    def test_toml_without_tomllib(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'tomllib', None)
+        path = tmp_path / 'tenants.toml'
+        path.write_text('[[tenants]]\ntoken = "token1"\nchat_id = 1\n')
+        with pytest.raises(config.ConfigError):
+            config.load_tenants(str(path))
+
+    def test_unknown_format(self, tmp_path):
+        path = tmp_path / 'tenants.ini'
+        path.write_text('')
+        with pytest.raises(config.ConfigError):
+            config.load_tenants(str(path))
+
+
+class TestValidate:
+
+    def test_reports_every_bad_entry(self):
+        records = [
+            {'token': '', 'chat_id': 'nobody'},
+            {'token': 'token', 'chat_id': 2, 'locale': 'fr'},
+            {'token': 'token', 'chat_id': 3, 'markup': 'BBCode', 'period': 0},
+            {'token': 'token', 'chat_id': '@channel'},
+            {'token': 'token', 'chat_id': 2},
+            'garbage',
+        ]
+        with pytest.raises(config.ConfigError) as error:
+            config.validate(records)
+        problems = error.value.problems
+        assert [problem.split(':')[0] for problem in problems] == [
+            'entry 1', 'entry 1', 'entry 2', 'entry 3', 'entry 3',
+            'entry 5', 'entry 6',
+        ]
+        assert '7 bad entries' in str(error.value)
+
+    def test_duplicate_after_normalisation(self):
+        with pytest.raises(config.ConfigError) as error:
+            config.validate([
+                {'token': 'token', 'chat_id': '0123'},
+                {'token': 'token', 'chat_id': 123},
+            ])
+        assert error.value.problems[0].startswith('entry 2')
+
+    def test_valid_records_pass(self):
+        config.validate(RECORDS)
+
+
+class TestConfigWatcher:
+
+    def test_notices_changes(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text('[]')
+        watcher = config.ConfigWatcher(str(path))
+        assert not watcher.changed()
+        path.write_text(json.dumps(RECORDS))
+        assert watcher.changed()
+        assert not watcher.changed()
+        os.remove(path)
+        assert watcher.changed()
+
+
+class TestReload:
+
+    def test_reload_keeps_old_tenants_on_error(
+            self, homework_module, tmp_path, monkeypatch):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps(RECORDS))
+        monkeypatch.setattr(homework_module, 'TENANTS_FILE', str(path))
+        monkeypatch.setattr(homework_module, 'WORKER_NAME', None)
+        tenants = homework_module.load_tenants()
+        store = homework_module.state.MemoryStateStore()
+        student = tenants.get('student')
+        student.timestamp = 42
+
+        for broken in (
+            json.dumps([{'token': '', 'chat_id': 1}]),
+            json.dumps(RECORDS)[:-5],
+        ):
+            path.write_text(broken)
+            homework_module.reload_tenants(tenants, store)
+            assert [tenant.name for tenant in tenants] == ['1', 'student']
+
+        path.write_text(json.dumps(RECORDS[1:] + [
+            {'token': 'token3', 'chat_id': 3},
+        ]))
+        homework_module.reload_tenants(tenants, store)
+        assert [tenant.name for tenant in tenants] == ['student', '3']
+        assert tenants.get('student') is student
+        assert student.timestamp == 42
@@ -0,0 +1,93 @@
+import asyncio
+
+from telegram.error import RetryAfter
+
+import delivery
+from tenants import Tenant
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+class TestSplitText:
+
+    def test_lines_are_merged_up_to_limit(self):
+        assert delivery.split_text(['a' * 3, 'b' * 3, 'c' * 3], limit=8) == [
+            ('aaa\n\nbbb', 2), ('ccc', 1)
+        ]
+
+    def test_long_line_is_kept(self):
+        assert delivery.split_text(['a' * 10], limit=8) == [('a' * 10, 1)]
+
+
+class TestTokenBucket:
+
+    def test_wait_after_burst(self):
+        bucket = delivery.TokenBucket(rate=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert 0.4 < bucket.reserve() <= 0.5
+
+
+class TestDeliveryQueue:
+
+    def test_lines_for_one_chat_are_coalesced(self):
+        sent = []
+
+        async def send(recipient, text):
+            sent.append((recipient.chat_id, text))
+            return True
+
+        async def scenario():
+            queue = delivery.DeliveryQueue(send)
+            first, second = Tenant('token', 1), Tenant('token', 2)
+            results = await asyncio.gather(
+                queue.put(first, 'one'),
+                queue.put(first, 'two'),
+                queue.put(second, 'three'),
+            )
+            return queue, results
+
+        queue, results = run(scenario())
+        assert results == [True, True, True]
+        assert sorted(sent) == [(1, 'one\n\ntwo'), (2, 'three')]
+        assert queue.counters['messages'] == 2
+        assert queue.counters['merged_lines'] == 1
+
+    def test_retry_after_is_honoured(self, monkeypatch):
+        calls = []
+        pauses = []
+
+        async def send(recipient, text):
+            calls.append(text)
+            if len(calls) == 1:
+                raise RetryAfter(7)
+            return True
+
+        async def fake_sleep(seconds):
+            pauses.append(seconds)
+
+        monkeypatch.setattr(delivery.asyncio, 'sleep', fake_sleep)
+
+        async def scenario():
+            queue = delivery.DeliveryQueue(send)
+            return queue, await queue.put(Tenant('token', 1), 'text')
+
+        queue, result = run(scenario())
+        assert result is True
+        assert calls == ['text', 'text']
+        assert 7 in pauses
+        assert queue.counters['retries'] == 1
+
+    def test_failed_delivery(self):
+        async def send(recipient, text):
+            return ''
+
+        async def scenario():
+            queue = delivery.DeliveryQueue(send)
+            return queue, await queue.put(Tenant('token', 1), 'text')
+
+        queue, result = run(scenario())
+        assert result is False
+        assert queue.counters['failed'] == 1
@@ -0,0 +1,278 @@
+import threading
+
+import pytest
+import requests
+
+from errors import APIConnectionError, APIEndpointError, APIRateLimited
+from scheduler import Scheduler
+import state
+import utils
+from tenants import Tenant
+
+
+pytestmark = pytest.mark.usefixtures('session_uses_requests_get')
+
+
+class TestPollingEngine:
+
+    def test_cycles_run_concurrently(self, monkeypatch, random_timestamp,
+                                     homework_module):
+        states_qty = 3
+        barrier = threading.Barrier(states_qty, timeout=2)
+
+        def mock_response_get(*args, **kwargs):
+            barrier.wait()
+            return utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        sent = []
+        monkeypatch.setattr(
+            homework_module, 'send_message',
+            lambda bot, message: sent.append(message)
+        )
+        engine = homework_module.PollingEngine(utils.MockTelegramBot())
+        try:
+            engine.run_cycle([
+                Tenant(f'token{i}', i, timestamp=random_timestamp)
+                for i in range(states_qty)
+            ])
+        finally:
+            engine.close()
+        assert not barrier.broken, (
+            'Циклы опроса должны выполняться одновременно.'
+        )
+        assert sent == []
+
+    def test_cycle_sends_new_status(self, monkeypatch, random_timestamp,
+                                    homework_module):
+        def mock_response_get(*args, **kwargs):
+            response = utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+            response.json = lambda: {
+                'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+                'current_date': random_timestamp
+            }
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        bot = utils.MockTelegramBot()
+        engine = homework_module.PollingEngine(bot)
+        try:
+            engine.run_cycle([
+                Tenant('token', '12345', timestamp=random_timestamp)
+            ])
+        finally:
+            engine.close()
+        assert bot.chat_id == '12345'
+        assert bot.text.endswith(
+            homework_module.HOMEWORK_VERDICTS['approved']
+        )
+
+    def test_tenant_headers_used(self, monkeypatch, random_timestamp,
+                                 homework_module):
+        seen = []
+
+        def mock_response_get(*args, headers=None, **kwargs):
+            seen.append(headers['Authorization'])
+            return utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        engine = homework_module.PollingEngine(
+            utils.MockTelegramBot(), concurrency=2
+        )
+        try:
+            engine.run_cycle([
+                Tenant(f'token{i}', i, timestamp=random_timestamp)
+                for i in range(5)
+            ])
+        finally:
+            engine.close()
+        assert sorted(seen) == [f'OAuth token{i}' for i in range(5)]
+
+    def test_from_date_follows_current_date(self, monkeypatch,
+                                            random_timestamp,
+                                            homework_module):
+        from_dates = []
+
+        def mock_response_get(*args, params=None, **kwargs):
+            from_dates.append(params['from_date'])
+            return utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp + len(from_dates),
+                **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        tenant = Tenant('token', 1, timestamp=random_timestamp)
+        engine = homework_module.PollingEngine(
+            utils.MockTelegramBot(), scheduler=Scheduler(base_period=0)
+        )
+        try:
+            for _ in range(3):
+                engine.run_cycle([tenant])
+        finally:
+            engine.close()
+        assert from_dates == [
+            random_timestamp, random_timestamp + 1, random_timestamp + 2
+        ]
+        assert tenant.timestamp == random_timestamp + 3
+
+    def test_status_is_not_resent_after_restart(self, monkeypatch, tmp_path,
+                                                random_timestamp,
+                                                homework_module):
+        def mock_response_get(*args, **kwargs):
+            response = utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+            response.json = lambda: {
+                'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+                'current_date': random_timestamp
+            }
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        sent = []
+
+        def mock_send_message(bot, message):
+            sent.append(message)
+            return message
+
+        monkeypatch.setattr(homework_module, 'send_message', mock_send_message)
+        path = str(tmp_path / 'state.sqlite3')
+        for _ in range(2):
+            store = state.open_store('sqlite', path)
+            tenant = Tenant('token', 1, timestamp=0)
+            store.restore([tenant])
+            engine = homework_module.PollingEngine(
+                utils.MockTelegramBot(), store
+            )
+            try:
+                engine.run_cycle([tenant])
+            finally:
+                engine.close()
+        assert len(sent) == 1
+        assert tenant.timestamp == random_timestamp
+
+
+    def test_repeated_errors_are_sent_once(self, monkeypatch,
+                                           homework_module):
+        calls = []
+
+        def mock_response_get(*args, **kwargs):
+            calls.append(1)
+            raise requests.RequestException('down')
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        sent = []
+
+        def mock_send_message(bot, message):
+            sent.append(message)
+            return message
+
+        monkeypatch.setattr(homework_module, 'send_message', mock_send_message)
+        engine = homework_module.PollingEngine(
+            utils.MockTelegramBot(),
+            scheduler=Scheduler(base_period=0, error_period=0)
+        )
+        engine.breaker.threshold = 3
+        engine.breaker.errors = (Exception,)
+        tenant = Tenant('token', 1, timestamp=0)
+        try:
+            for _ in range(5):
+                engine.run_cycle([tenant])
+        finally:
+            engine.close()
+        assert len(sent) == 1
+        assert len(calls) == 3
+
+    def test_only_outages_open_breaker(self, homework_module):
+        is_outage = homework_module.is_outage
+        assert is_outage(APIConnectionError('url', detail='down'))
+        assert is_outage(APIEndpointError('url', status=502))
+        assert not is_outage(APIEndpointError('url', status=403))
+        assert not is_outage(APIRateLimited('url', status=429))
+        assert not is_outage(ValueError())
+
+
+class TestFindChanges:
+
+    def test_only_transitions_oldest_first(self, homework_module):
+        homeworks = homework_module.check_response({'homeworks': [
+            {'id': 3, 'homework_name': 'hw3', 'status': 'reviewing'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+            {'id': 1, 'homework_name': 'hw1', 'status': 'rejected'},
+        ]})
+        statuses = {'2': 'approved', '1': 'reviewing'}
+        changes = homework_module.find_changes(homeworks, statuses)
+        assert [homework.key for homework in changes] == ['1', '3']
+
+    def test_name_is_key_without_id(self, homework_module):
+        homeworks = homework_module.check_response({'homeworks': [
+            {'homework_name': 'hw1', 'status': 'approved'}
+        ]})
+        assert homework_module.find_changes(
+            homeworks, {'hw1': 'approved'}
+        ) == []
+
+    def test_every_change_is_sent_in_one_message(self, monkeypatch,
+                                                 random_timestamp,
+                                                 homework_module):
+        def mock_response_get(*args, **kwargs):
+            response = utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+            response.json = lambda: {
+                'homeworks': [
+                    {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+                    {'id': 1, 'homework_name': 'hw1', 'status': 'rejected'},
+                ],
+                'current_date': random_timestamp
+            }
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        sent = []
+
+        def mock_send_message(bot, message):
+            sent.append(message)
+            return message
+
+        monkeypatch.setattr(homework_module, 'send_message', mock_send_message)
+        tenant = Tenant('token', 1, timestamp=0)
+        engine = homework_module.PollingEngine(
+            utils.MockTelegramBot(), scheduler=Scheduler(base_period=0)
+        )
+        try:
+            engine.run_cycle([tenant])
+            engine.run_cycle([tenant])
+        finally:
+            engine.close()
+        assert len(sent) == 1
+        assert sent[0].index('"hw1"') < sent[0].index('"hw2"')
+        assert tenant.statuses == {'1': 'rejected', '2': 'approved'}
+
+    def test_cycle_returns_delay_and_polls_only_due(self, monkeypatch,
+                                                    random_timestamp,
+                                                    homework_module):
+        calls = []
+
+        def mock_response_get(*args, **kwargs):
+            calls.append(kwargs['headers'])
+            return utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp, **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        engine = homework_module.PollingEngine(utils.MockTelegramBot())
+        tenants = [Tenant('token', 1, timestamp=0)]
+        try:
+            assert engine.run_cycle(tenants) == homework_module.RETRY_PERIOD
+            assert len(calls) == 1
+            assert engine.run_cycle(tenants) > 0
+            assert len(calls) == 1
+        finally:
+            engine.close()
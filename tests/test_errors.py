@@ -0,0 +1,118 @@
+import pytest
+import requests
+
+from errors import (
+    APIConnectionError, APIEndpointError, APIRateLimited, APIResponseError,
+    parse_retry_after, redact
+)
+import utils
+
+
+pytestmark = pytest.mark.usefixtures('session_uses_requests_get')
+
+
+TOKEN = 'y0_secret-token'
+
+
+class MockResponse:
+
+    def __init__(self, status_code, headers=None, body=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body or {}
+
+    def json(self):
+        return self.body
+
+
+def tenant_headers(homework_module, monkeypatch):
+    monkeypatch.setattr(
+        homework_module, 'HEADERS', {'Authorization': f'OAuth {TOKEN}'}
+    )
+
+
+class TestErrors:
+
+    def test_redact(self):
+        headers = {'Authorization': f'OAuth {TOKEN}', 'Accept': 'json'}
+        assert redact(headers) == {
+            'Authorization': 'OAuth ***', 'Accept': 'json'
+        }
+        assert headers['Authorization'] == f'OAuth {TOKEN}'
+        assert redact({'cookie': 'a=b'}) == {'cookie': '***'}
+
+    @pytest.mark.parametrize('value, expected', [
+        (None, None),
+        ('120', 120),
+        ('-5', 0),
+        ('Wed, 21 Oct 2015 07:28:00 GMT', 30),
+        ('soon', None),
+    ])
+    def test_parse_retry_after(self, value, expected):
+        assert parse_retry_after(value, now=1445412450) == expected
+
+    def test_fields_and_message(self):
+        error = APIEndpointError(
+            'https://api', {'from_date': 0},
+            {'Authorization': f'OAuth {TOKEN}'}, status=500, latency=0.5
+        )
+        assert (error.status, error.latency, error.retry_after) == (
+            500, 0.5, None
+        )
+        assert TOKEN not in str(error)
+        assert '500' in str(error) and 'https://api' in str(error)
+
+
+class TestRequestErrors:
+
+    def test_connection_error(self, monkeypatch, homework_module):
+        tenant_headers(homework_module, monkeypatch)
+
+        def fail(*args, **kwargs):
+            raise requests.ConnectionError('refused')
+
+        monkeypatch.setattr(requests, 'get', fail)
+        with pytest.raises(APIConnectionError) as info:
+            homework_module.get_api_answer(0)
+        assert isinstance(info.value, ConnectionError)
+        assert 'refused' in str(info.value)
+        assert TOKEN not in str(info.value)
+        assert info.value.latency >= 0
+
+    def test_rate_limited(self, monkeypatch, homework_module):
+        tenant_headers(homework_module, monkeypatch)
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: MockResponse(429, {'Retry-After': '90'})
+        )
+        with pytest.raises(APIRateLimited) as info:
+            homework_module.get_api_answer(0)
+        assert isinstance(info.value, APIEndpointError)
+        assert (info.value.status, info.value.retry_after) == (429, 90)
+
+    def test_bad_status(self, monkeypatch, random_timestamp, homework_module):
+        tenant_headers(homework_module, monkeypatch)
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: utils.MockResponseGET(
+                random_timestamp=random_timestamp, http_status=500
+            )
+        )
+        with pytest.raises(APIEndpointError) as info:
+            homework_module.get_api_answer(0)
+        assert info.value.status == 500
+        assert TOKEN not in str(info.value)
+
+    def test_error_in_body(self, monkeypatch, homework_module):
+        tenant_headers(homework_module, monkeypatch)
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: MockResponse(
+                200, body={'code': 'not_authenticated'}
+            )
+        )
+        with pytest.raises(APIResponseError) as info:
+            homework_module.get_api_answer(0)
+        assert isinstance(info.value, ValueError)
+        assert 'code: not_authenticated' in str(info.value)
+        assert TOKEN not in str(info.value)
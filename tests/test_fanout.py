@@ -0,0 +1,222 @@
+import threading
+import time
+
+import pytest
+import requests
+import telegram
+
+from fanout import FanOutRunner
+from tenants import Tenant
+
+
+pytestmark = pytest.mark.usefixtures('session_uses_requests_get')
+
+
+class RecordingBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+        return text
+
+
+class TestFanOutRunner:
+
+    def test_completion_order_and_errors(self):
+        def task(item):
+            if item == 'bad':
+                raise ValueError(item)
+            time.sleep(item)
+            return item * 10
+
+        runner = FanOutRunner(task, workers=3)
+        try:
+            results = list(runner.run([0.2, 'bad', 0.05]))
+        finally:
+            runner.close()
+        assert [item for item, _, _ in results] == ['bad', 0.05, 0.2]
+        assert isinstance(results[0][2], ValueError)
+        assert results[1][1:] == (0.5, None)
+
+    def test_worker_count_is_bounded(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def task(item):
+            with lock:
+                running.append(item)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(item)
+
+        runner = FanOutRunner(task, workers=4)
+        try:
+            assert len(list(runner.run(range(20)))) == 20
+        finally:
+            runner.close()
+        assert max(peak) <= 4
+
+    def test_task_timeout(self):
+        release = threading.Event()
+
+        def task(item):
+            if item == 'slow':
+                release.wait(5)
+            return item
+
+        runner = FanOutRunner(task, workers=2, timeout=0.1)
+        started = time.monotonic()
+        try:
+            results = {item: error for item, _, error in runner.run(
+                ['slow', 'fast']
+            )}
+        finally:
+            release.set()
+            runner.close()
+        assert time.monotonic() - started < 1
+        assert results['fast'] is None
+        assert isinstance(results['slow'], TimeoutError)
+
+    def test_interrupted_run_cancels_pending_tasks(self):
+        started, finished = [], []
+
+        def task(item):
+            started.append(item)
+            time.sleep(0.05)
+            finished.append(item)
+            return item
+
+        runner = FanOutRunner(task, workers=1)
+        results = runner.run(range(10))
+        next(results)
+        results.close()
+        runner.close(timeout=1)
+        assert len(started) <= 2
+        assert finished == started
+
+
+class TestThreadedPoller:
+
+    def test_cycle_sends_changes_per_tenant(self, monkeypatch, homework_module):
+        def mock_get(*args, headers=None, **kwargs):
+            token = headers['Authorization'].split()[-1]
+
+            class Response:
+                status_code = 200
+
+                def json(self):
+                    return {
+                        'homeworks': [{
+                            'homework_name': f'{token}-hw',
+                            'status': 'approved'
+                        }],
+                        'current_date': 42,
+                    }
+
+            return Response()
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        bot = RecordingBot()
+        poller = homework_module.ThreadedPoller(bot, workers=4)
+        tenants = [Tenant(f'token{i}', i, timestamp=0) for i in range(8)]
+        try:
+            assert poller.run_cycle(tenants) == homework_module.RETRY_PERIOD
+            poller.run_cycle(tenants)
+        finally:
+            poller.shutdown()
+        assert sorted(chat_id for chat_id, _ in bot.sent) == list(range(8))
+        for chat_id, text in bot.sent:
+            assert f'token{chat_id}-hw' in text
+        assert all(tenant.timestamp == 42 for tenant in tenants)
+
+    def test_errors_are_reported(self, monkeypatch, homework_module):
+        def fail(*args, **kwargs):
+            raise requests.ConnectionError('refused')
+
+        monkeypatch.setattr(requests, 'get', fail)
+        reports = []
+
+        class Reporter:
+            def report(self, polled, errors, delay):
+                reports.append((polled, errors, delay))
+
+        bot = RecordingBot()
+        poller = homework_module.ThreadedPoller(bot, health=Reporter())
+        tenant = Tenant('token', 1, timestamp=0)
+        try:
+            poller.run_cycle([tenant])
+            poller.run_cycle([tenant])
+        finally:
+            poller.shutdown()
+        assert reports == [(1, 1, homework_module.RETRY_PERIOD)] * 2
+        assert len(bot.sent) == 1
+        assert 'refused' in bot.sent[0][1]
+        assert tenant.timestamp == 0
+
+    def test_retry_after_is_waited_out(self, monkeypatch, homework_module):
+        def mock_get(*args, **kwargs):
+            class Response:
+                status_code = 200
+
+                def json(self):
+                    return {
+                        'homeworks': [{
+                            'homework_name': 'hw', 'status': 'approved'
+                        }],
+                        'current_date': 42,
+                    }
+
+            return Response()
+
+        class FloodedBot(RecordingBot):
+            def send_message(self, chat_id, text):
+                raise telegram.error.RetryAfter(5)
+
+        pauses = []
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(homework_module.time, 'sleep', pauses.append)
+        poller = homework_module.ThreadedPoller(FloodedBot(), max_retries=2)
+        tenant = Tenant('token', 1, timestamp=0)
+        try:
+            assert poller.run_cycle([tenant]) == homework_module.RETRY_PERIOD
+        finally:
+            poller.shutdown()
+        assert pauses == [5] * 3
+        assert tenant.timestamp == 0
+        assert tenant.statuses == {}
+
+    def test_stop_skips_remaining_deliveries(self, monkeypatch,
+                                             homework_module):
+        def mock_get(*args, headers=None, **kwargs):
+            class Response:
+                status_code = 200
+
+                def json(self):
+                    return {
+                        'homeworks': [{
+                            'homework_name': 'hw', 'status': 'approved'
+                        }],
+                        'current_date': 42,
+                    }
+
+            return Response()
+
+        class StoppingBot(RecordingBot):
+            def send_message(self, chat_id, text):
+                poller.stop()
+                return super().send_message(chat_id, text)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        bot = StoppingBot()
+        poller = homework_module.ThreadedPoller(bot, workers=2)
+        tenants = [Tenant(f'token{i}', i, timestamp=0) for i in range(8)]
+        try:
+            poller.run_cycle(tenants)
+        finally:
+            poller.shutdown(1)
+        assert len(bot.sent) == 1
+        assert sum(tenant.timestamp == 42 for tenant in tenants) == 1
@@ -0,0 +1,77 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import threading
+import time
+
+import pytest
+
+from errors import APIEndpointError
+import http_client
+
+
+class Unavailable(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        self.send_response(503)
+        self.send_header('Retry-After', '30')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def unavailable_api(monkeypatch, homework_module):
+    server = HTTPServer(('127.0.0.1', 0), Unavailable)
+    Unavailable.requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        homework_module, 'ENDPOINT', f'http://127.0.0.1:{server.server_port}/'
+    )
+    monkeypatch.setattr(
+        homework_module, 'session',
+        http_client.LazySession(pool_size=2, backoff_factor=0)
+    )
+    yield Unavailable
+    server.shutdown()
+    server.server_close()
+
+
+class TestBuildSession:
+
+    def test_adapter_is_pooled_with_retries(self):
+        session = http_client.build_session(pool_size=4, retries=2)
+        adapter = session.get_adapter('https://practicum.yandex.ru/')
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 2
+        assert 503 in adapter.max_retries.status_forcelist
+        assert not adapter.max_retries.respect_retry_after_header
+        assert session.get_adapter('http://localhost/') is adapter
+
+    def test_get_api_answer_has_timeout(self, monkeypatch, homework_module):
+        seen = {}
+
+        def mock_get(*args, **kwargs):
+            seen.update(kwargs)
+            raise http_client.requests.RequestException('stop')
+
+        monkeypatch.setattr(homework_module.session, 'get', mock_get)
+        try:
+            homework_module.get_api_answer(0)
+        except Exception:
+            pass
+        assert seen['timeout'] == homework_module.HTTP_TIMEOUT
+
+    def test_retry_after_is_left_to_scheduler(
+        self, unavailable_api, homework_module
+    ):
+        started = time.monotonic()
+        with pytest.raises(APIEndpointError) as error:
+            homework_module.get_api_answer(0)
+        assert time.monotonic() - started < 5
+        assert error.value.status == 503
+        assert error.value.retry_after == 30
+        assert unavailable_api.requests == http_client.RETRIES + 1
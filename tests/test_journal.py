@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+
+from commands import History
+from delivery import DeliveryQueue
+import journal
+from schema import Homework
+from tenants import Tenant
+
+
+def make_journal(tmp_path, **options):
+    return journal.NotificationJournal(
+        str(tmp_path / 'history.db'), **options
+    )
+
+
+class TestNotificationJournal:
+
+    def test_history_survives_restart(self, tmp_path):
+        history = make_journal(tmp_path, size=2)
+        for number, status in enumerate(('reviewing', 'rejected', 'approved')):
+            history.record(
+                'student', Homework('7', 'hw7', status),
+                message_id=number, sent_at=100 + number
+            )
+        history.close()
+        history = make_journal(tmp_path, size=2)
+        assert history.get('student') == [
+            Homework('7', 'hw7', 'rejected'), Homework('7', 'hw7', 'approved')
+        ]
+        assert history.homework_name('student', '7') == 'hw7'
+        assert history.homework_name('student', '8') == '8'
+        assert history.get('other') == []
+
+    def test_range_query(self, tmp_path):
+        history = make_journal(tmp_path)
+        for sent_at, name in ((10, 'one'), (20, 'two'), (30, 'one')):
+            history.record(
+                name, Homework('1', 'hw1', 'approved'),
+                message_id=sent_at, sent_at=sent_at
+            )
+        assert [
+            notification.message_id
+            for notification in history.query(since=15)
+        ] == [20, 30]
+        assert history.query(tenant='one', until=20) == [
+            journal.Notification('one', '1', 'hw1', 'approved', 10, 10)
+        ]
+        assert len(history.query(limit=2)) == 2
+
+    def test_compact_drops_old_records(self, tmp_path):
+        history = make_journal(tmp_path, retention=100)
+        history.record('student', Homework('1', 'hw1', 'reviewing'),
+                       sent_at=50)
+        history.record('student', Homework('1', 'hw1', 'approved'),
+                       sent_at=500)
+        assert history.compact(now=550) == 1
+        assert history.get('student') == [Homework('1', 'hw1', 'approved')]
+
+    def test_compact_keeps_records_by_default(self, tmp_path):
+        history = make_journal(tmp_path)
+        history.record('student', Homework('1', 'hw1', 'reviewing'),
+                       sent_at=0)
+        assert history.compact() == 0
+        assert history.get('student') == [Homework('1', 'hw1', 'reviewing')]
+
+    def test_open_history_without_path_is_in_memory(self):
+        assert isinstance(journal.open_history(), History)
+
+
+class TestNotifyChanges:
+
+    def test_message_id_is_recorded(self, homework_module, tmp_path):
+        async def send(recipient, text):
+            return SimpleNamespace(message_id=42)
+
+        async def scenario():
+            await homework_module.notify_changes(
+                tenant, [Homework('7', 'hw7', 'approved')],
+                DeliveryQueue(send), history
+            )
+
+        tenant = Tenant('token', 1)
+        history = make_journal(tmp_path)
+        asyncio.new_event_loop().run_until_complete(scenario())
+        assert tenant.statuses == {'7': 'approved'}
+        [notification] = history.query(tenant='1')
+        assert (notification.key, notification.message_id) == ('7', 42)
@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+from lazy import LazyModule
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyModule:
+
+    def test_loads_on_first_attribute(self):
+        module = LazyModule('colorsys')
+        assert 'not loaded' in repr(module)
+        assert module.rgb_to_hsv(0, 0, 0) == (0, 0, 0)
+        assert 'not loaded' not in repr(module)
+
+    def test_sees_patched_attributes(self, monkeypatch):
+        module = LazyModule('json')
+        monkeypatch.setattr(json, 'dumps', lambda value: 'patched')
+        assert module.dumps({}) == 'patched'
+
+    def test_import_homework_defers_heavy_dependencies(self):
+        result = subprocess.run(
+            [sys.executable, '-c', (
+                'import json, sys; import homework; '
+                'print(json.dumps(sorted(sys.modules)))'
+            )],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        loaded = {
+            name.split('.')[0] for name in json.loads(result.stdout)
+        }
+        assert not loaded & {
+            'telegram', 'requests', 'dotenv', 'yaml', 'tomllib'
+        }
@@ -0,0 +1,63 @@
+import json
+import logging
+import threading
+
+import logs
+
+
+class Expensive:
+    def __init__(self):
+        self.threads = []
+
+    def __repr__(self):
+        self.threads.append(threading.current_thread())
+        return 'expensive'
+
+
+def make_logger(name, level):
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+class TestQueuedLogging:
+
+    def test_message_is_rendered_in_listener(self, tmp_path):
+        logger = make_logger('test_logs.listener', logging.DEBUG)
+        payload = Expensive()
+        path = tmp_path / 'bot.log'
+        with logs.queued(logger, str(path)):
+            logger.debug(payload)
+        assert payload.threads
+        assert threading.current_thread() not in payload.threads
+        assert '[DEBUG] expensive' in path.read_text()
+
+    def test_disabled_debug_is_not_rendered(self, tmp_path):
+        logger = make_logger('test_logs.disabled', logging.INFO)
+        payload = Expensive()
+        with logs.queued(logger, str(tmp_path / 'bot.log')):
+            logger.debug(payload)
+        assert payload.threads == []
+
+    def test_json_lines(self, tmp_path):
+        logger = make_logger('test_logs.json', logging.DEBUG)
+        path = tmp_path / 'bot.log'
+        with logs.queued(logger, str(path), json_lines=True):
+            try:
+                raise ValueError('boom')
+            except ValueError:
+                logger.exception('Статус %s', 'approved')
+        record = json.loads(path.read_text())
+        assert record['level'] == 'ERROR'
+        assert record['message'] == 'Статус approved'
+        assert 'ValueError: boom' in record['exc_info']
+
+    def test_level_reaches_module_loggers(self, tmp_path):
+        root = logging.getLogger()
+        previous = root.level
+        path = tmp_path / 'bot.log'
+        with logs.queued(root, str(path), level=logging.DEBUG):
+            logging.getLogger('test_logs.module').debug('delivered')
+        assert root.level == previous
+        assert '[DEBUG] delivered' in path.read_text()
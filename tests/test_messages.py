@@ -0,0 +1,84 @@
+import pytest
+
+from messages import CATALOGS, HTML, MARKDOWN, PLAIN, Renderer, escape
+from tenants import Tenant
+
+
+class TestRenderer:
+
+    def test_default_catalog_matches_verdicts(self, homework_module):
+        assert CATALOGS['ru'].verdicts == homework_module.HOMEWORK_VERDICTS
+
+    @pytest.mark.parametrize('markup, expected', [
+        (PLAIN, 'Изменился статус проверки работы "a_b<c>". '),
+        (MARKDOWN, 'Изменился статус проверки работы "*a*\\_*b<c>*". '),
+        (HTML, 'Изменился статус проверки работы "<b>a_b&lt;c&gt;</b>". '),
+    ])
+    def test_markup(self, markup, expected):
+        text = Renderer().status('a_b<c>', 'approved', 'ru', markup)
+        assert text.startswith(expected)
+
+    def test_unknown_locale_falls_back(self):
+        renderer = Renderer()
+        assert renderer.status('hw', 'rejected', 'xx', PLAIN) == (
+            renderer.status('hw', 'rejected', 'ru', PLAIN)
+        )
+        assert renderer.status('hw', 'rejected', 'en', PLAIN) != (
+            renderer.status('hw', 'rejected', 'ru', PLAIN)
+        )
+
+    def test_markdown_emphasis_is_not_escaped_inside(self):
+        text = Renderer().status(
+            'andmerk93__hw05_final.zip', 'approved', 'ru', MARKDOWN
+        )
+        assert '"*andmerk93*\\_\\_*hw05*\\_*final.zip*"' in text
+
+    def test_every_catalog_has_every_text(self):
+        for catalog in CATALOGS.values():
+            assert all(catalog)
+            assert catalog.verdicts.keys() == CATALOGS['ru'].verdicts.keys()
+
+    def test_status_is_cached(self):
+        renderer = Renderer(cache_size=2)
+        for _ in range(3):
+            renderer.status('hw', 'approved', 'ru', PLAIN)
+        info = renderer.status.cache_info()
+        assert (info.hits, info.misses) == (2, 1)
+
+    def test_unknown_markup(self):
+        with pytest.raises(ValueError):
+            escape('text', 'bbcode')
+
+    def test_error_is_escaped(self):
+        assert '&lt;' in Renderer().error(ValueError('<x>'), 'ru', HTML)
+
+
+class TestTenantMessages:
+
+    def test_parse_status_uses_tenant_locale(self, homework_module):
+        token = homework_module.CURRENT_TENANT.set(
+            Tenant('token', 1, locale='en', markup=HTML)
+        )
+        try:
+            text = homework_module.parse_status(
+                {'homework_name': 'hw1', 'status': 'approved'}
+            )
+        finally:
+            homework_module.CURRENT_TENANT.reset(token)
+        assert text == Renderer().status('hw1', 'approved', 'en', HTML)
+
+    def test_send_message_sets_parse_mode(self, homework_module):
+        class Bot:
+            def send_message(self, chat_id, text, **kwargs):
+                self.kwargs = kwargs
+                return text
+
+        bot = Bot()
+        token = homework_module.CURRENT_TENANT.set(
+            Tenant('token', 1, markup=MARKDOWN)
+        )
+        try:
+            homework_module.send_message(bot, 'text')
+        finally:
+            homework_module.CURRENT_TENANT.reset(token)
+        assert bot.kwargs == {'parse_mode': 'Markdown'}
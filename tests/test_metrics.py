@@ -0,0 +1,72 @@
+import urllib.error
+import urllib.request
+
+import pytest
+import requests
+
+import metrics
+import utils
+from tenants import Tenant
+
+
+pytestmark = pytest.mark.usefixtures('session_uses_requests_get')
+
+
+class TestMetrics:
+
+    def test_histogram_is_cumulative(self):
+        histogram = metrics.Histogram(bounds=(0.1, 1))
+        for value in (0.05, 0.5, 0.5, 5):
+            histogram.observe(value)
+        lines = list(histogram.samples('latency', '{function="f"}'))
+        assert lines == [
+            'latency_bucket{function="f",le="0.1"} 1',
+            'latency_bucket{function="f",le="1"} 3',
+            'latency_bucket{function="f",le="+Inf"} 4',
+            'latency_sum{function="f"} 6.05',
+            'latency_count{function="f"} 4',
+        ]
+
+    def test_registry_reuses_metrics(self):
+        registry = metrics.Registry()
+        counter = registry.counter('errors_total', 'Errors', error='KeyError')
+        assert registry.counter(
+            'errors_total', 'Errors', error='KeyError'
+        ) is counter
+        counter.inc()
+        registry.gauge('lag_seconds', 'Lag').set(2.5)
+        text = registry.render()
+        assert '# TYPE errors_total counter' in text
+        assert 'errors_total{error="KeyError"} 1' in text
+        assert 'lag_seconds 2.5' in text
+        with pytest.raises(ValueError):
+            registry.gauge('errors_total', 'Errors')
+
+    def test_endpoint(self):
+        registry = metrics.Registry()
+        registry.counter('polls_total', 'Polls').inc(3)
+        server = metrics.serve(0, registry=registry)
+        url = f'http://127.0.0.1:{server.server_port}'
+        try:
+            with urllib.request.urlopen(url + '/metrics') as response:
+                assert b'polls_total 3' in response.read()
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(url + '/')
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_pipeline_is_instrumented(self, monkeypatch, random_timestamp,
+                                      homework_module):
+        def mock_response_get(*args, **kwargs):
+            raise requests.RequestException('down')
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        api_calls = homework_module.GET_API_ANSWER_SECONDS.count
+        engine = homework_module.PollingEngine(utils.MockTelegramBot())
+        try:
+            engine.run_cycle([Tenant('token', 1, timestamp=0)])
+        finally:
+            engine.close()
+        assert homework_module.GET_API_ANSWER_SECONDS.count == api_calls + 1
+        assert 'homework_errors_total' in metrics.REGISTRY.render()
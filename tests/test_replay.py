@@ -0,0 +1,132 @@
+import pytest
+import requests
+
+import replay
+from tenants import Tenant
+
+
+pytestmark = pytest.mark.usefixtures('session_uses_requests_get')
+
+
+def answer(*homeworks, current_date=1000):
+    return {
+        'homeworks': [
+            {'id': key, 'homework_name': f'hw{key}', 'status': status}
+            for key, status in homeworks
+        ],
+        'current_date': current_date,
+    }
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.pauses = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.pauses.append(seconds)
+        self.now += seconds
+
+
+class TestRecorder:
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / 'answers.jsonl')
+        recorder = replay.Recorder(path)
+        recorder.record('student', 0, answer((1, 'reviewing')), 0.25)
+        recorder.record('student', 1000, {'code': 'not_authenticated'}, 0.5)
+        recorder.close()
+        first, second = replay.read_records(path)
+        assert (first.tenant, first.from_date, first.latency) == (
+            'student', 0, 0.25
+        )
+        assert first.response == answer((1, 'reviewing'))
+        assert second.response == {'code': 'not_authenticated'}
+        assert first.at <= second.at
+
+    def test_nothing_is_written_until_first_record(self, tmp_path):
+        path = tmp_path / 'answers.jsonl'
+        replay.Recorder(str(path)).close()
+        assert not path.exists()
+
+
+class TestPlayer:
+
+    def records(self):
+        return [
+            replay.Recorded('student', at, 0, 0.1, {})
+            for at in (100.0, 101.0, 103.0)
+        ]
+
+    def test_wall_clock_pacing(self):
+        clock = FakeClock()
+        played = list(replay.Player(self.records(), 2, clock, clock.sleep))
+        assert len(played) == 3
+        assert clock.pauses == [0.5, 1.0]
+
+    def test_as_fast_as_possible(self):
+        clock = FakeClock()
+        list(replay.Player(self.records(), 0, clock, clock.sleep))
+        assert clock.pauses == []
+
+
+class TestReplayEngine:
+
+    def test_get_api_answer_is_recorded(self, homework_module, monkeypatch,
+                                        tmp_path):
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return answer((1, 'approved'))
+
+        path = str(tmp_path / 'answers.jsonl')
+        recorder = replay.Recorder(path)
+        monkeypatch.setattr(homework_module, 'RECORDER', recorder)
+        monkeypatch.setattr(
+            requests, 'get', lambda *args, **kwargs: Response()
+        )
+        token = homework_module.CURRENT_TENANT.set(Tenant('token', 1))
+        try:
+            homework_module.get_api_answer(0)
+        finally:
+            homework_module.CURRENT_TENANT.reset(token)
+        recorder.close()
+        [record] = replay.read_records(path)
+        assert (record.tenant, record.from_date) == ('1', 0)
+        assert record.response == answer((1, 'approved'))
+
+    def test_replay_is_deterministic(self, homework_module):
+        records = [
+            replay.Recorded('1', 0.0, 0, 0.1, answer(
+                (1, 'reviewing'), current_date=10
+            )),
+            replay.Recorded('1', 1.0, 10, 0.1, answer(
+                (1, 'reviewing'), current_date=20
+            )),
+            replay.Recorded('1', 2.0, 20, 0.1, {'code': 'UnknownError'}),
+            replay.Recorded('1', 3.0, 20, 0.1, answer(
+                (2, 'reviewing'), (1, 'approved'), current_date=30
+            )),
+        ]
+        bot = replay.DryRunBot()
+        engine = homework_module.ReplayEngine(bot, records, speed=0)
+        tenant = Tenant('token', 1, timestamp=0)
+        try:
+            stats = engine.replay([tenant])
+        finally:
+            engine.shutdown()
+        assert (stats['records'], stats['errors']) == (4, 1)
+        texts = [text for _, text in bot.sent]
+        assert len(texts) == 4
+        assert 'hw1' in texts[0] and 'UnknownError' in texts[1]
+        assert 'hw1' in texts[2] and 'hw2' in texts[3]
+        assert tenant.statuses == {'1': 'approved', '2': 'reviewing'}
+        assert tenant.timestamp == 30
+        assert [
+            homework.status for homework in engine.history.get('1')
+        ] == ['reviewing', 'approved', 'reviewing']
@@ -0,0 +1,94 @@
+import pytest
+
+from scheduler import Scheduler
+from tenants import Tenant
+
+
+@pytest.fixture
+def scheduler():
+    return Scheduler(
+        base_period=600, reviewing_period=60, idle_period=1800,
+        idle_after=3600, error_period=30, max_error_period=300,
+        backoff_errors=(ConnectionError,)
+    )
+
+
+class TestScheduler:
+
+    def test_new_tenants_are_due_now(self, scheduler):
+        tenants = [Tenant('token', 1), Tenant('token', 2)]
+        scheduler.sync(tenants, now=0)
+        assert scheduler.due(0) == tenants
+        assert scheduler.due(0) == []
+        assert scheduler.delay(0) == 600
+
+    def test_earliest_first(self, scheduler):
+        slow, fast = Tenant('token', 1), Tenant('token', 2)
+        fast.statuses['hw'] = 'reviewing'
+        scheduler.sync([slow, fast], now=0)
+        scheduler.due(0)
+        scheduler.reschedule(slow, 0)
+        scheduler.reschedule(fast, 0)
+        assert scheduler.delay(0) == 60
+        assert scheduler.due(60) == [fast]
+        assert scheduler.due(600) == [slow]
+
+    def test_idle_tenant_backs_off(self, scheduler):
+        tenant = Tenant('token', 1)
+        scheduler.sync([tenant], now=0)
+        scheduler.due(0)
+        scheduler.reschedule(tenant, 3600)
+        assert scheduler.delay(3600) == 1800
+        scheduler.due(5400)
+        scheduler.reschedule(tenant, 5400, changed=True)
+        assert scheduler.delay(5400) == 600
+
+    def test_exponential_backoff_on_errors(self, scheduler):
+        tenant = Tenant('token', 1)
+        scheduler.sync([tenant], now=0)
+        delays = []
+        now = 0
+        for _ in range(6):
+            scheduler.due(now)
+            scheduler.reschedule(tenant, now, error=ConnectionError())
+            delays.append(scheduler.delay(now))
+            now += delays[-1]
+        assert 15 <= delays[0] <= 45
+        assert 60 <= delays[2] <= 180
+        assert all(delay <= 450 for delay in delays)
+        scheduler.due(now)
+        scheduler.reschedule(tenant, now, error=ValueError())
+        assert scheduler.delay(now) == 600
+
+    def test_retry_after_is_respected(self, scheduler):
+        tenant = Tenant('token', 1)
+        scheduler.sync([tenant], now=0)
+        scheduler.due(0)
+        error = ConnectionError()
+        error.retry_after = 1000
+        scheduler.reschedule(tenant, 0, error=error)
+        assert scheduler.delay(0) == 1000
+
+    def test_removed_tenant_is_dropped(self, scheduler):
+        first, second = Tenant('token', 1), Tenant('token', 2)
+        scheduler.sync([first, second], now=0)
+        scheduler.sync([second], now=0)
+        assert scheduler.due(0) == [second]
+
+    def test_paused_tenant_skipped_until_resumed(self, scheduler):
+        tenant = Tenant('token', 1)
+        scheduler.sync([tenant], now=0)
+        assert scheduler.pause(tenant.name)
+        assert not scheduler.pause(tenant.name)
+        assert scheduler.due(0) == []
+        assert scheduler.delay(0) == 600
+        assert scheduler.resume(tenant.name, 100)
+        assert not scheduler.resume(tenant.name, 100)
+        assert scheduler.due(100) == [tenant]
+
+    def test_tenant_period_overrides_base(self, scheduler):
+        tenant = Tenant('token', 1, period=120)
+        scheduler.sync([tenant], now=0)
+        scheduler.due(0)
+        scheduler.reschedule(tenant, 0)
+        assert scheduler.delay(0) == 120
@@ -0,0 +1,43 @@
+import pytest
+
+from schema import Homework, ResponseValidator
+
+
+@pytest.fixture
+def validator():
+    return ResponseValidator(('approved', 'reviewing', 'rejected'))
+
+
+class TestResponseValidator:
+
+    def test_records(self, validator):
+        assert validator.response({'homeworks': [
+            {'id': 7, 'homework_name': 'hw7', 'status': 'approved',
+             'reviewer_comment': 'ok'},
+            {'homework_name': 'hw8', 'status': 'reviewing'},
+        ], 'current_date': 1}) == [
+            Homework('7', 'hw7', 'approved'),
+            Homework('hw8', 'hw8', 'reviewing'),
+        ]
+
+    @pytest.mark.parametrize('data, error', [
+        ([], TypeError),
+        ({}, KeyError),
+        ({'homeworks': {}}, TypeError),
+        ({'homeworks': ['hw']}, TypeError),
+        ({'homeworks': [{'homework_name': 'hw'}]}, KeyError),
+        ({'homeworks': [{'homework_name': 'hw', 'status': 'new'}]},
+         ValueError),
+        ({'homeworks': [{'status': 'approved'}]}, KeyError),
+    ])
+    def test_errors(self, validator, data, error):
+        with pytest.raises(error) as info:
+            validator.response(data)
+        assert len(str(info.value)) > 20
+
+    def test_parse_status_accepts_records(self, homework_module):
+        assert homework_module.parse_status(
+            Homework('1', 'hw1', 'rejected')
+        ) == homework_module.parse_status(
+            {'homework_name': 'hw1', 'status': 'rejected'}
+        )
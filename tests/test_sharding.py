@@ -0,0 +1,162 @@
+import json
+import os
+import sys
+import time
+
+from sharding import HashRing, HealthReporter, shard
+import supervisor
+from supervisor import Supervisor
+from tenants import Tenant
+
+
+WORKER_SCRIPT = '''
+import os
+from sharding import open_reporter
+reporter = open_reporter(os.environ['WORKER_NAME'], os.environ['HEALTH_FD'])
+reporter.report(polled=1, errors=0, delay=0.1)
+reporter.close()
+'''
+
+
+class TestHashRing:
+
+    def test_every_worker_gets_tenants(self):
+        ring = HashRing([f'worker-{i}' for i in range(4)])
+        owners = [ring.node(f'tenant-{i}') for i in range(4000)]
+        for i in range(4):
+            assert 700 < owners.count(f'worker-{i}') < 1300
+
+    def test_adding_worker_moves_few_tenants(self):
+        keys = [f'tenant-{i}' for i in range(4000)]
+        ring = HashRing([f'worker-{i}' for i in range(4)])
+        before = [ring.node(key) for key in keys]
+        ring.add('worker-4')
+        after = [ring.node(key) for key in keys]
+        moved = [old for old, new in zip(before, after) if old != new]
+        assert all(new == 'worker-4' for old, new in zip(before, after)
+                   if old != new)
+        assert len(moved) < len(keys) / 3
+        ring.remove('worker-4')
+        assert [ring.node(key) for key in keys] == before
+
+    def test_shard_splits_tenants(self):
+        tenants = [Tenant('token', i) for i in range(50)]
+        workers = ['a', 'b', 'c']
+        shards = [shard(tenants, worker, workers) for worker in workers]
+        assert sorted(
+            tenant.chat_id for part in shards for tenant in part
+        ) == list(range(50))
+
+
+class TestHealth:
+
+    def test_reporter_writes_json_lines(self):
+        read_fd, write_fd = os.pipe()
+        reporter = HealthReporter('worker-0', write_fd)
+        reporter.report(3, 1, 600)
+        reporter.close()
+        with os.fdopen(read_fd, encoding='utf-8') as pipe:
+            report = json.loads(pipe.readline())
+        assert report['worker'] == 'worker-0'
+        assert (report['polled'], report['errors'], report['delay']) == (
+            3, 1, 600
+        )
+
+    def test_reporter_sends_heartbeats(self):
+        read_fd, write_fd = os.pipe()
+        reporter = HealthReporter('worker-0', write_fd, heartbeat=0.05)
+        with os.fdopen(read_fd, encoding='utf-8') as pipe:
+            beat = json.loads(pipe.readline())
+            reporter.close()
+        assert beat['heartbeat'] is True
+        assert beat['delay'] == 0.05
+
+    def test_heartbeats_keep_long_cycle_alive(self, monkeypatch):
+        monkeypatch.setattr(supervisor, 'STARTUP_TIMEOUT', 0.3)
+        watcher = Supervisor(
+            count=1, health_grace=0.3, command=[sys.executable, '-c', (
+                'import os, time\n'
+                'from sharding import open_reporter\n'
+                'reporter = open_reporter(\n'
+                '    os.environ["WORKER_NAME"], os.environ["HEALTH_FD"], 0.1\n'
+                ')\n'
+                'time.sleep(30)\n'
+            )]
+        )
+        try:
+            watcher.start('worker-0')
+            pid = watcher.workers['worker-0'].process.pid
+            deadline = time.monotonic() + 1.5
+            while time.monotonic() < deadline:
+                watcher.step(0.1)
+            assert watcher.workers['worker-0'].process.pid == pid
+            assert watcher.workers['worker-0'].report is None
+        finally:
+            watcher.shutdown()
+
+    def test_engine_reports_cycles(self, homework_module):
+        reports = []
+
+        class Reporter:
+            def report(self, polled, errors, delay):
+                reports.append((polled, errors, delay))
+
+        engine = homework_module.PollingEngine(None, health=Reporter())
+        try:
+            engine.run_cycle([])
+        finally:
+            engine.close()
+        assert reports == [(0, 0, homework_module.RETRY_PERIOD)]
+
+    def test_supervisor_restarts_exited_workers(self):
+        supervisor = Supervisor(
+            count=2, command=[sys.executable, '-c', WORKER_SCRIPT],
+            health_grace=0
+        )
+        try:
+            for name in supervisor.names:
+                supervisor.start(name)
+            first = {
+                name: worker.process.pid
+                for name, worker in supervisor.workers.items()
+            }
+            restarted = set()
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and len(restarted) < 2:
+                supervisor.step(0.1)
+                restarted.update(
+                    name for name, worker in supervisor.workers.items()
+                    if worker.process.pid != first[name]
+                )
+        finally:
+            supervisor.shutdown()
+        assert sorted(restarted) == supervisor.names
+
+    def test_supervisor_gives_shards_own_files(self, monkeypatch):
+        monkeypatch.setenv('STATE_PATH', '/data/state.db')
+        monkeypatch.setenv('HISTORY_PATH', '/data/history.db')
+        monkeypatch.setenv('COMMANDS', '1')
+        monkeypatch.delenv('RECORD_FILE', raising=False)
+        supervisor = Supervisor(count=2)
+        env = supervisor.environment('worker-1')
+        assert env['STATE_PATH'] == '/data/state.worker-1.db'
+        assert env['HISTORY_PATH'] == '/data/history.worker-1.db'
+        assert 'RECORD_FILE' not in env
+        assert env['COMMANDS'] == '0'
+
+    def test_supervisor_stops_workers_together(self):
+        supervisor = Supervisor(
+            count=3, command=[sys.executable, '-c', (
+                'import signal, time\n'
+                'signal.pthread_sigmask(signal.SIG_BLOCK, [signal.SIGTERM])\n'
+                'signal.sigwait([signal.SIGTERM])\n'
+                'time.sleep(1)\n'
+            )]
+        )
+        for name in supervisor.names:
+            supervisor.start(name)
+        time.sleep(0.3)
+        started = time.monotonic()
+        supervisor.shutdown()
+        assert time.monotonic() - started < 2.5
+        assert not supervisor.workers
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from shutdown import GracefulExit, ShutdownSignal
+import state
+from tenants import Tenant
+
+
+class SlowBot:
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        time.sleep(self.delay)
+        self.sent.append(text)
+        return text
+
+
+class TestShutdownSignal:
+
+    def test_signal_interrupts_only_idle_wait(self):
+        stopped = []
+        shutdown = ShutdownSignal(lambda: stopped.append(True))
+        shutdown.handle(signal.SIGTERM, None)
+        assert shutdown.requested and stopped == [True]
+        with pytest.raises(GracefulExit):
+            with shutdown.idle():
+                pass
+
+    def test_real_signal_wakes_sleep(self):
+        shutdown = ShutdownSignal()
+        shutdown.install(signals=(signal.SIGUSR1,))
+        started = time.monotonic()
+        try:
+            with pytest.raises(GracefulExit):
+                with shutdown.idle():
+                    os.kill(os.getpid(), signal.SIGUSR1)
+                    time.sleep(5)
+        finally:
+            shutdown.uninstall()
+        assert time.monotonic() - started < 1
+        assert signal.getsignal(signal.SIGUSR1) == signal.SIG_DFL
+
+
+class TestEngineShutdown:
+
+    def test_queue_drained_and_state_flushed(self, homework_module):
+        store = state.MemoryStateStore(flush_interval=3600)
+        bot = SlowBot(0.05)
+        engine = homework_module.PollingEngine(bot, store)
+        tenants = [Tenant('token', chat_id) for chat_id in range(3)]
+
+        async def enqueue():
+            for tenant in tenants:
+                store.save(tenant)
+                engine.queue.put(tenant, 'bye')
+
+        engine.loop.run_until_complete(enqueue())
+        engine.shutdown(timeout=5)
+        assert bot.sent == ['bye'] * 3
+        assert not store._dirty
+        assert engine.loop.is_closed()
+
+    def test_drain_deadline(self, homework_module, caplog):
+        bot = SlowBot(0.3)
+        engine = homework_module.PollingEngine(bot)
+        tenant = Tenant('token', 1)
+
+        async def enqueue():
+            engine.queue.put(tenant, 'first')
+            await asyncio.sleep(0.05)
+            engine.queue.put(tenant, 'second')
+
+        engine.loop.run_until_complete(enqueue())
+        started = time.monotonic()
+        engine.shutdown(timeout=0.1)
+        assert time.monotonic() - started < 1
+        assert 'not drained' in caplog.text
+
+    def test_stop_skips_new_polls(self, homework_module):
+        engine = homework_module.PollingEngine(SlowBot(0))
+        engine.stop()
+        try:
+            results = engine.loop.run_until_complete(
+                engine.poll_all([Tenant('token', 1)])
+            )
+        finally:
+            engine.close()
+        assert results == [(False, None)]
@@ -0,0 +1,134 @@
+import sqlite3
+
+import pytest
+
+import state
+from tenants import Tenant
+
+
+def open_backend(backend, tmp_path, **kwargs):
+    return state.open_store(backend, str(tmp_path / backend), **kwargs)
+
+
+class TestStateStore:
+
+    @pytest.mark.parametrize('backend', ['sqlite', 'file'])
+    def test_restore_after_restart(self, backend, tmp_path):
+        store = open_backend(backend, tmp_path)
+        store.save(Tenant('token', 1, timestamp=100,
+                          statuses={'hw1': 'reviewing'},
+                          names={'hw1': 'Спринт 1'}))
+        store.close()
+
+        tenants = [
+            Tenant('token', 1, timestamp=0),
+            Tenant('token', 2, timestamp=0),
+        ]
+        open_backend(backend, tmp_path).restore(tenants)
+        assert tenants[0].timestamp == 100
+        assert tenants[0].statuses == {'hw1': 'reviewing'}
+        assert tenants[0].names == {'hw1': 'Спринт 1'}
+        assert tenants[1].timestamp == 0
+
+    def test_sqlite_table_without_names_is_upgraded(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                'CREATE TABLE tenant_state ('
+                'name TEXT PRIMARY KEY, cursor INTEGER, statuses TEXT)'
+            )
+            connection.execute(
+                'INSERT INTO tenant_state VALUES (?, ?, ?)',
+                ('1', 100, '{"hw1": "approved"}')
+            )
+        connection.close()
+        store = state.open_store('sqlite', path)
+        tenant = Tenant('token', 1, timestamp=0)
+        store.restore([tenant])
+        assert tenant.statuses == {'hw1': 'approved'}
+        assert tenant.names == {}
+        tenant.names['hw1'] = 'hw1.zip'
+        store.save(tenant)
+        store.close()
+        restored = Tenant('token', 1, timestamp=0)
+        state.open_store('sqlite', path).restore([restored])
+        assert restored.names == {'hw1': 'hw1.zip'}
+
+    @pytest.mark.parametrize('backend', ['sqlite', 'file'])
+    def test_writes_are_batched(self, backend, tmp_path, monkeypatch):
+        store = open_backend(backend, tmp_path, flush_interval=3600)
+        writes = []
+        monkeypatch.setattr(store, '_write', lambda records: writes.append(
+            sorted(records)
+        ))
+        for cursor in range(10):
+            for chat_id in range(3):
+                store.save(Tenant('token', chat_id, timestamp=cursor))
+            store.flush_if_due()
+        assert writes == []
+        store.flush()
+        assert writes == [['0', '1', '2']]
+
+    def test_file_is_compacted(self, tmp_path):
+        store = open_backend('file', tmp_path, flush_interval=0)
+        tenant = Tenant('token', 1)
+        for cursor in range(5):
+            tenant.timestamp = cursor
+            store.save(tenant)
+            store.flush()
+        store.close()
+        reopened = open_backend('file', tmp_path)
+        assert reopened.lines == 1
+        restored = Tenant('token', 1, timestamp=0)
+        reopened.restore([restored])
+        assert restored.timestamp == 4
+
+    def test_unchanged_state_is_not_written(self, tmp_path):
+        store = open_backend('file', tmp_path, flush_interval=0)
+        tenants = [Tenant('token', chat_id) for chat_id in range(10)]
+        for _ in range(5):
+            for tenant in tenants:
+                store.save(tenant)
+            store.flush()
+        assert store.lines == 10
+
+    def test_file_is_compacted_while_running(self, tmp_path):
+        store = open_backend('file', tmp_path, flush_interval=0)
+        tenant = Tenant('token', 1)
+        for cursor in range(50):
+            tenant.timestamp = cursor
+            store.save(tenant)
+            store.flush()
+            assert store.lines <= 2
+        with open(store.path, encoding='utf-8') as file:
+            assert len(file.readlines()) == store.lines
+
+    def test_memory_backend(self):
+        store = state.open_store()
+        store.save(Tenant('token', 1, timestamp=5))
+        tenant = Tenant('token', 1, timestamp=0)
+        store.restore([tenant])
+        assert tenant.timestamp == 5
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            state.open_store('redis')
+
+    def test_torn_last_line_is_dropped(self, tmp_path):
+        store = open_backend('file', tmp_path, flush_interval=0)
+        store.save(Tenant('token', 1, timestamp=5))
+        store.close()
+        path = store.path
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write('["2", {"cursor": 7, "stat')
+        reopened = open_backend('file', tmp_path, flush_interval=0)
+        assert reopened.lines == 1
+        reopened.save(Tenant('token', 3, timestamp=9))
+        reopened.close()
+        tenants = [Tenant('token', 1), Tenant('token', 3)]
+        open_backend('file', tmp_path).restore(tenants)
+        assert [tenant.timestamp for tenant in tenants] == [5, 9]
+
+    def test_path_is_required(self):
+        with pytest.raises(ValueError):
+            state.open_store('sqlite')
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+import requests
+
+from scheduler import Scheduler
+from streaming import StreamedResponse
+from tenants import Tenant
+
+
+pytestmark = pytest.mark.usefixtures('session_uses_requests_get')
+
+
+RESPONSE = {
+    'homeworks': [
+        {'id': 2, 'homework_name': 'hw2 ☃', 'status': 'approved',
+         'reviewer_comment': 'ок, 12.5 из 13'},
+        {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'},
+    ],
+    'current_date': 1234567890,
+}
+
+
+def split(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class MockStreamGET:
+
+    def __init__(self, body):
+        self.body = json.dumps(body, ensure_ascii=False).encode()
+        self.status_code = 200
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        return iter(split(self.body, 7))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.closed = True
+
+
+class RecordingBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        self.sent.append(text)
+        return text
+
+
+class TestStreamedResponse:
+
+    @pytest.mark.parametrize('size', [1, 2, 3, 5, 64, 10 ** 6])
+    def test_any_chunk_boundary(self, size):
+        body = json.dumps(RESPONSE, ensure_ascii=False, indent=1).encode()
+        stream = StreamedResponse(split(body, size))
+        assert list(stream) == RESPONSE['homeworks']
+        assert stream.meta == {'current_date': 1234567890}
+
+    def test_meta_after_homeworks(self):
+        stream = StreamedResponse([b'{"homeworks": [], "code": "x"}'])
+        assert list(stream) == []
+        assert stream.meta == {'code': 'x'}
+
+    def test_error_without_homeworks(self):
+        stream = StreamedResponse([b'{"error": {"error": "bad"}}'])
+        assert list(stream) == []
+        assert stream.meta == {'error': {'error': 'bad'}}
+
+    @pytest.mark.parametrize('body, error', [
+        (b'[]', TypeError),
+        (b'{}', KeyError),
+        (b'{"homeworks": {}}', TypeError),
+        (b'{"homeworks": [1, 2', json.JSONDecodeError),
+        (b'{"homeworks": [1 2]}', json.JSONDecodeError),
+    ])
+    def test_errors(self, body, error):
+        with pytest.raises(error):
+            list(StreamedResponse(split(body, 3)))
+
+
+class TestReadApiChanges:
+
+    def test_known_statuses_skipped(self, monkeypatch, homework_module):
+        response = MockStreamGET(RESPONSE)
+        monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: response)
+        homeworks, meta = homework_module.read_api_changes(
+            0, {'2': 'approved', '1': 'approved'}
+        )
+        assert [homework.key for homework in homeworks] == ['1']
+        assert meta == {'current_date': 1234567890}
+        assert response.closed
+
+    def test_error_in_body(self, monkeypatch, homework_module):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: MockStreamGET({'code': 'not_authenticated'})
+        )
+        with pytest.raises(ValueError):
+            homework_module.read_api_changes(0, {})
+
+    def test_engine_streaming_cycle(self, monkeypatch, homework_module):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: MockStreamGET(RESPONSE)
+        )
+        bot = RecordingBot()
+        engine = homework_module.PollingEngine(
+            bot, scheduler=Scheduler(base_period=0), streaming=True
+        )
+        tenant = Tenant('token', '12345', timestamp=0)
+        try:
+            engine.run_cycle([tenant])
+            engine.run_cycle([tenant])
+        finally:
+            engine.close()
+        assert len(bot.sent) == 1
+        assert 'hw1' in bot.sent[0] and 'hw2' in bot.sent[0]
+        assert tenant.timestamp == 1234567890
+        assert tenant.statuses == {'1': 'reviewing', '2': 'approved'}
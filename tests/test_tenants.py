@@ -0,0 +1,36 @@
+import pytest
+
+from tenants import Tenant, TenantRegistry
+
+
+class TestTenantRegistry:
+
+    def test_add_and_remove(self):
+        registry = TenantRegistry([Tenant('token1', 1), Tenant('token2', 2)])
+        assert len(registry) == 2
+        assert registry.get('1').headers == {'Authorization': 'OAuth token1'}
+        registry.remove('1')
+        assert [tenant.name for tenant in registry] == ['2']
+        with pytest.raises(KeyError):
+            registry.remove('1')
+
+    def test_duplicate_name(self):
+        with pytest.raises(ValueError):
+            TenantRegistry([Tenant('token1', 1), Tenant('token2', 1)])
+
+    def test_token_not_in_repr(self):
+        assert 'secret' not in repr(Tenant('secret', 1))
+
+    def test_sync_keeps_polling_state(self):
+        kept = Tenant('token1', 1, timestamp=5, statuses={'hw': 'approved'})
+        registry = TenantRegistry([kept, Tenant('token2', 2)])
+        added, removed = registry.sync([
+            Tenant('token9', 1, locale='en', period=60), Tenant('token3', 3)
+        ])
+        assert [tenant.name for tenant in added] == ['3']
+        assert [tenant.name for tenant in removed] == ['2']
+        assert registry.get('1') is kept
+        assert kept.token == 'token9'
+        assert kept.headers == {'Authorization': 'OAuth token9'}
+        assert (kept.locale, kept.period) == ('en', 60)
+        assert (kept.timestamp, kept.statuses) == (5, {'hw': 'approved'})